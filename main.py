@@ -1,14 +1,19 @@
+import io
 import logging
+import multiprocessing
 import os
 import traceback
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 
 from module.Hydro.entry import HydroHandler
 from module.config import Configs, Config
+from module.daemon import BoardService, serve
+from module.scheduler import BoardScheduler
 from module.board.misc import MiscBoardGenerator
 import argparse
 
 from module.constants import VERSION_INFO
-from module.utils import search_user_by_uid, fuzzy_search_user
+from module.utils import search_user_by_uid, fuzzy_search_user, export_json, get_daily_path
 from module.verdict import ALIAS_MAP
 import sys
 
@@ -27,46 +32,46 @@ class DefaultHelpParser(argparse.ArgumentParser):
         sys.exit(2)
 
 
-def generate(cur_config: Config, multi: bool = False, separate_cols: bool = False):
+def prepare(cur_config: Config, multi: bool = False) -> tuple[str | None, str]:
+    """网络阶段：更新榜单数据或完成用户查询，返回需要渲染的榜单类型 (无需渲染时为 None) 和输出路径"""
     logging.info(f"正在生成 {cur_config.get_config()['board_name']} 榜单")
+    output = args.output
     if not args.output or multi:
-        args.output = os.path.join(work_dir, "data",
-                                   f'{cur_config.get_config()["id"]}-output.png') \
-            if args.full or args.now else os.path.join(work_dir, "data",
+        output = os.path.join(work_dir, "data",
+                              f'{cur_config.get_config()["id"]}-output.png') \
+            if args.full or args.now or args.weekly or args.monthly else os.path.join(work_dir, "data",
                                                        f'{cur_config.get_config()["id"]}-output.txt')
     handler = sub_handlers.get(cur_config.get_config()['handler'])(cur_config)
     if args.full:
         logging.info("正在生成昨日榜单")
         handler.save_daily("full")
-        output_img = MiscBoardGenerator(cur_config, "full",
-                                        os.path.join(work_dir, "data", f'logo.png'),
-                                        separate_columns=separate_cols).render()
-        output_img.write_file(args.output)
-        logging.info(f"生成图片成功，路径为{args.output}")
+        return "full", output
     elif args.now:
         logging.info("正在生成0点到现在时间的榜单")
         handler.save_daily("now")
-        output_img = MiscBoardGenerator(cur_config, "now",
-                                        os.path.join(work_dir, "data", f'logo.png'),
-                                        verdict=args.verdict,
-                                        separate_columns=separate_cols).render()
-        output_img.write_file(args.output)
-        logging.info(f"生成图片成功，路径为{args.output}")
+        return "now", output
+    elif args.weekly or args.monthly:
+        board_type = "weekly" if args.weekly else "monthly"
+        logging.info(f"正在生成{'近七日' if args.weekly else '近三十日'}榜单")
+        handler.save_daily(board_type)
+        return board_type, output
     elif args.query_uid:
         logging.info("正在查询指定用户信息")
         result = search_user_by_uid(args.query_uid, handler)
-        with open(args.output, "w", encoding='utf-8') as f:
+        with open(output, "w", encoding='utf-8') as f:
             f.write(result)
     elif args.query_name:
         logging.info("正在查询指定用户信息")
         result = fuzzy_search_user(cur_config, args.query_name, handler)
-        with open(args.output, "w", encoding='utf-8') as f:
+        with open(output, "w", encoding='utf-8') as f:
             f.write(result)
+    return None, output
 
 
-if __name__ == "__main__":
+def setup_logging(level: int = logging.INFO):
+    """日志同时输出到终端与 info.log；以 spawn 方式启动的子进程不会继承，需要各自调用"""
     logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+    logger.setLevel(level)
 
     console_handler = logging.StreamHandler(sys.stderr)
     console_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
@@ -76,27 +81,118 @@ if __name__ == "__main__":
     logger.addHandler(console_handler)
     logger.addHandler(file_handler)
 
+
+def render(cur_config: Config, board_type: str, verdict: str, separate_cols: bool, output: str,
+           seed: str | None = None, strip_height: int | None = None, page: int = 1):
+    """渲染阶段：只依赖本地数据"""
+    generator = MiscBoardGenerator(cur_config, board_type,
+                                   os.path.join(work_dir, "data", f'logo.png'),
+                                   verdict=verdict,
+                                   separate_columns=separate_cols,
+                                   seed=seed,
+                                   page=page)
+    if strip_height is not None:
+        paths = generator.render_strips_to_files(output, strip_height)
+        logging.info(f"分条生成图片成功，共 {len(paths)} 张，路径为{', '.join(paths)}")
+        return
+    generator.render_to_file(output)
+    logging.info(f"生成图片成功，路径为{output}")
+
+
+def render_in_process(config_path: str, board_id: str, board_type: str, verdict: str,
+                      separate_cols: bool, output: str, seed: str | None = None,
+                      strip_height: int | None = None, page: int = 1):
+    """供进程池调用，参数均可序列化，在子进程中重新加载配置"""
+    for cur_config in Configs(config_path).get_configs():
+        if cur_config.get_config()['id'] == board_id:
+            render(cur_config, board_type, verdict, separate_cols, output, seed, strip_height, page)
+
+
+def generate(cur_config: Config, multi: bool = False, separate_cols: bool = False):
+    board_type, output = prepare(cur_config, multi)
+    if board_type is not None:
+        verdict = args.verdict if board_type == "now" else ALIAS_MAP["AC"]
+        render(cur_config, board_type, verdict, separate_cols, output, args.seed, args.strip_height, args.page)
+
+
+def generate_parallel(cur_configs: list[Config], separate_cols: bool = False) -> list[str]:
+    """
+    并行生成全部榜单：网络阶段在线程池中并发，渲染阶段分配到与 CPU 核数相同的进程池
+
+    进程池以 spawn 方式启动：此时网络线程仍在运行，fork 可能复制其持有的日志或连接池锁
+
+    单个榜单出错不影响其余榜单，返回各榜单的错误信息
+    """
+    failures = []
+    if not cur_configs:
+        logging.warning("没有需要生成的榜单")
+        return failures
+
+    def _record_failure(board_id: str, e: Exception):
+        logging.error(f"榜单 {board_id} 生成失败: {e}", exc_info=True)
+        failures.append(f"[{board_id}]\n" + "".join(traceback.format_exception(e)))
+
+    with ThreadPoolExecutor(max_workers=len(cur_configs)) as network_pool, \
+            ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"),
+                                initializer=setup_logging, initargs=(logging.getLogger().level,)) as render_pool:
+        prepare_futures = {network_pool.submit(prepare, cur_config, True): cur_config for cur_config in cur_configs}
+        render_futures = {}
+        for future in as_completed(prepare_futures):
+            board_id = prepare_futures[future].get_config()['id']
+            try:
+                board_type, output = future.result()
+            except Exception as e:
+                _record_failure(board_id, e)
+                continue
+            if board_type is not None:
+                verdict = args.verdict if board_type == "now" else ALIAS_MAP["AC"]
+                render_futures[render_pool.submit(render_in_process, args.config, board_id, board_type,
+                                                  verdict, separate_cols, output, args.seed,
+                                                  args.strip_height, args.page)] = board_id
+        for future in as_completed(render_futures):
+            try:
+                future.result()
+            except Exception as e:
+                _record_failure(render_futures[future], e)
+    return failures
+
+
+if __name__ == "__main__":
+    setup_logging()
+
     parser = DefaultHelpParser(description='Peeper-Board-Generator OJ榜单图片生成器')
     required_para = parser.add_mutually_exclusive_group(required=True)
     required_para.add_argument('--version', action="store_true", help='版本号信息')
     required_para.add_argument('--full', action="store_true", help='生成昨日榜单')
     required_para.add_argument('--now', action="store_true", help='生成从今日0点到当前时间的榜单')
+    required_para.add_argument('--weekly', action="store_true", help='生成近七日 (截至昨日) 的榜单')
+    required_para.add_argument('--monthly', action="store_true", help='生成近三十日 (截至昨日) 的榜单')
     required_para.add_argument('--query_uid', type=str, help='根据 uid 查询指定用户的信息')
     required_para.add_argument('--query_name', type=str, help='根据用户名查询指定用户的信息')
+    required_para.add_argument('--daemon', action="store_true", help='以常驻服务模式运行，通过 HTTP 接口生成榜单')
+    required_para.add_argument('--export_json', action="store_true", help='将昨日与今日数据导出为旧版 json 文件')
     parser.add_argument('--output', type=str, help='指定生成图片的路径 (包含文件名)')
     parser.add_argument('--verdict', type=str, help='指定榜单对应verdict (使用简写)')
     parser.add_argument('--id', type=str, help='生成指定 id 的榜单(留空则生成全部榜单)')
     parser.add_argument('--separate_cols', action='store_true', help='是否启用分栏特性')
+    parser.add_argument('--page', type=int, help='配置了 full_board_page_size 时，完整榜单生成第几页', default=1)
+    parser.add_argument('--strip_height', type=int, help='分条渲染，将榜单按该高度 (像素) 拆分为多张图片')
+    parser.add_argument('--seed', type=str, help='指定渲染的随机种子 (整数，或 auto 表示由榜单 id 与日期导出)')
     parser.add_argument('--performance_statistics', action='store_true', help='性能测试')
     parser.add_argument('--config', type=str, help='指定配置文件路径', default=os.path.join(os.path.dirname(__file__), "config.json"))
     parser.add_argument('--verbose', action='store_true', help='显示更详细的日志')
+    parser.add_argument('--host', type=str, help='常驻服务监听的地址', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='常驻服务监听的端口', default=8000)
+    parser.add_argument('--schedule', action='store_true', help='常驻服务模式下在后台定时预渲染榜单')
+    parser.add_argument('--parallel', action='store_true', help='未指定 id 时并行生成全部榜单')
 
     statistics_file = open(os.path.join(work_dir, "performance.log"), 'w', encoding='utf-8')
+    failures = []
     try:
         args = parser.parse_args()
 
         if args.verbose:
-            logger.setLevel(logging.DEBUG)
+            logging.getLogger().setLevel(logging.DEBUG)
 
         # 从指定路径加载配置
         configs = Configs(args.config).get_configs()
@@ -107,6 +203,23 @@ if __name__ == "__main__":
             print(f"Peeper-Board-Generator {VERSION_INFO}")
             with open(args.output, "w", encoding='utf-8') as f:
                 f.write(f"Peeper-Board-Generator {VERSION_INFO}")
+        elif args.export_json:
+            for config in configs:
+                if args.id and config.get_config()['id'] != args.id:
+                    continue
+                for is_yesterday in (True, False):
+                    if os.path.exists(get_daily_path(config, is_yesterday)):
+                        logging.info(f"已导出 {export_json(config, is_yesterday)}")
+        elif args.daemon:
+            if args.id:
+                configs = [config for config in configs if config.get_config()['id'] == args.id]
+            for config in configs:
+                config.set_config('statistic_file', statistics_file)
+            service = BoardService(configs, sub_handlers, os.path.join(work_dir, "data", 'logo.png'),
+                                   separate_cols=args.separate_cols, prerendered=args.schedule)
+            if args.schedule:
+                BoardScheduler(service).start()
+            serve(service, args.host, args.port)
         else:
             if not args.verdict:
                 args.verdict = ALIAS_MAP["AC"]
@@ -116,9 +229,18 @@ if __name__ == "__main__":
                 # 生成全部榜单
                 if args.output:
                     logging.warning("未指定榜单 id，output 参数无效")
-                for config in configs:
-                    config.set_config('statistic_file', statistics_file)
-                    generate(config, multi=True, separate_cols=args.separate_cols)
+                if args.parallel:
+                    # 各榜单的性能信息先写入独立缓冲区，结束后按榜单顺序合并
+                    statistic_buffers = [io.StringIO() for _ in configs]
+                    for config, statistic_buffer in zip(configs, statistic_buffers):
+                        config.set_config('statistic_file', statistic_buffer)
+                    failures = generate_parallel(configs, separate_cols=args.separate_cols)
+                    if not statistics_file.closed:
+                        statistics_file.write("".join(buffer.getvalue() for buffer in statistic_buffers))
+                else:
+                    for config in configs:
+                        config.set_config('statistic_file', statistics_file)
+                        generate(config, multi=True, separate_cols=args.separate_cols)
             else:
                 # 生成指定 id 的榜单
                 for config in configs:
@@ -127,7 +249,7 @@ if __name__ == "__main__":
                         generate(config, separate_cols=args.separate_cols)
                         break
         with open(os.path.join(work_dir, "last_traceback.log"), "w", encoding='utf-8') as f:
-            f.write("ok")
+            f.write("\n".join(failures) if failures else "ok")
     except Exception as e:
         logging.error(e, exc_info=True)
         with open(os.path.join(work_dir, "last_traceback.log"), "w", encoding='utf-8') as f:
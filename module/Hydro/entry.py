@@ -2,6 +2,7 @@ import datetime
 import json
 import logging
 import os
+from collections.abc import Sequence
 
 import requests
 
@@ -9,10 +10,31 @@ from module.Hydro.user import fetch_user
 from module.config import Config
 from module.Hydro.tools import reload_stats
 from module.handler import BasicHandler
-from module.structures import DailyJson, RankingData, SubmissionData
+from module.history import HistoryStore, RANGE_BOARD_DAYS
+from module.user_index import UserIndex
+from module.structures import DailyJson, RankingData, SubmissionData, SubmissionTable, UserData
 from module.Hydro.submission import fetch_submissions
 from module.Hydro.ranking import fetch_rankings
-from module.utils import save_json, get_date_string, load_json, fetch_url
+from module.utils import save_json, get_date_string, load_json, fetch_url, load_sync_state, save_sync_state, \
+    get_today_timestamp, create_session, json_headers, get_daily_path, read_daily_file
+
+
+def merge_submissions(cached_submissions: list[SubmissionData], fresh_submissions: list[SubmissionData],
+                      since: int) -> list[SubmissionData]:
+    """
+    合并本地与新获取的提交，按时间倒序排列
+
+    OJ 按评测记录 id 倒序返回记录，获取在第一条评测时间早于 since 的记录处停止，窗口内的旧记录不一定会被重新获取；
+    因此按评测记录 id 去重，新获取的记录覆盖同 id 的旧记录 (包括被重测的记录)，其余本地记录全部保留。
+    旧版本保存的记录没有 id，只能以窗口内新获取的为准
+    """
+    fresh_ids = {submission.record_id for submission in fresh_submissions if submission.record_id}
+    submissions = fresh_submissions + [
+        submission for submission in cached_submissions
+        if (submission.record_id not in fresh_ids if submission.record_id else submission.at < since)
+    ]
+    submissions.sort(key=lambda submission: submission.at, reverse=True)
+    return submissions
 
 
 class HydroHandler(BasicHandler):
@@ -31,12 +53,63 @@ class HydroHandler(BasicHandler):
             self.reloaded_stats = True
 
     def begin_session(self):
-        logging.info("尝试登录获取新 Session")
         credentials = self.config.get_config()["credentials"]
+        if self.config.get_config().get("session") is not None:
+            return  # 常驻模式下复用内存中的 Session，失效时由调用方清除
         if credentials is not None:
-            session = self.login(credentials)
+            session = self.restore_session()
+            if session is None:
+                logging.info("尝试登录获取新 Session")
+                session = self.login(credentials)
+                self.save_session(session)
+                logging.info("Session 获取成功")
             self.config.set_config("session", session)
-            logging.info("Session 获取成功")
+
+    def _session_file(self) -> str:
+        return os.path.join(self.config.work_dir, "data", f'{self.config.get_config()["id"]}-session.json')
+
+    def restore_session(self) -> requests.Session | None:
+        """从本地缓存恢复 Session，缓存过期或被 OJ 拒绝时返回 None"""
+        if not os.path.exists(self._session_file()):
+            return None
+        try:
+            with open(self._session_file(), "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached['expires'] < datetime.datetime.now().timestamp():
+                logging.info("本地 Session 已过期")
+                return None
+
+            session = create_session(self.config)
+            for cookie in cached['cookies']:
+                session.cookies.set(cookie['name'], cookie['value'],
+                                    domain=cookie['domain'], path=cookie['path'])
+        except (OSError, ValueError, KeyError, TypeError) as e:  # 缓存文件损坏时重新登录
+            logging.warning(f"本地 Session 缓存无法读取: {e}")
+            return None
+        try:  # 访问需要登录的设置页，未登录时会被重定向或拒绝
+            fetch_url(f"{self.url}home/settings/account", method='get', headers=json_headers,
+                      session=session, allow_redirects=False)
+        except ConnectionError:
+            logging.info("本地 Session 已失效")
+            return None
+        logging.info("已复用本地 Session")
+        return session
+
+    def save_session(self, session: requests.Session):
+        now = datetime.datetime.now().timestamp()
+        expires = now + self.config.get_config().get("session_ttl", 86400)
+        cookies = []
+        for cookie in session.cookies:
+            cookies.append({'name': cookie.name, 'value': cookie.value,
+                            'domain': cookie.domain, 'path': cookie.path})
+            if cookie.expires is not None:  # 以 OJ 下发的过期时间为准
+                expires = min(expires, cookie.expires)
+        # Cookie 与密码同样敏感，缓存文件只允许当前用户读写
+        fd = os.open(self._session_file(), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        if hasattr(os, "fchmod"):  # 已存在的文件保留原有权限，需要单独修改
+            os.fchmod(fd, 0o600)
+        with open(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps({'expires': expires, 'cookies': cookies}, indent=4))
 
     def get_yesterday(self):
         logging.info("开始爬取昨日数据")
@@ -44,17 +117,19 @@ class HydroHandler(BasicHandler):
         ranking = fetch_rankings(self.config)
         daily = DailyJson(fetch_submissions(self.config, True), ranking)
         save_json(self.config, daily, True)
+        with HistoryStore(self.config) as history:
+            history.ingest(get_date_string(True), daily, replace=True)
 
     def save_daily(self, mode: str):
         logging.info("开始保存 json 数据")
         self.begin_session()
-        if mode == "full":  # 检查昨日榜单的json文件日期是否为今日，如果是则跳过执行
-            json_file = f'{self.config.get_config()["id"]}-{get_date_string(True)}.json'
-            if not os.path.exists(os.path.join(self.config.work_dir, "data", json_file)):
+        if mode == "full" or mode in RANGE_BOARD_DAYS:  # 检查昨日榜单的json文件日期是否为今日，如果是则跳过执行
+            file_path = get_daily_path(self.config, True)
+            json_file = os.path.basename(file_path)
+            if not os.path.exists(file_path):
                 logging.info(f"昨日 json 数据 {json_file} 不存在")
                 self.get_yesterday()
-            file_timestamp = os.stat(
-                os.path.join(self.config.work_dir, "data", json_file)).st_mtime
+            file_timestamp = os.stat(file_path).st_mtime
 
             logging.info(
                 f"{json_file} 文件最后修改时间为 {datetime.datetime.fromtimestamp(file_timestamp).strftime('%Y-%m-%d %H:%M:%S')}")
@@ -63,33 +138,61 @@ class HydroHandler(BasicHandler):
             else:
                 self.get_yesterday()
         elif mode == "now":  # 检查昨日榜单文件是否生成
-            json_file = f'{self.config.get_config()["id"]}-{get_date_string(True)}.json'
-            file_path = os.path.join(self.config.work_dir, "data", json_file)
+            file_path = get_daily_path(self.config, True)
             if not os.path.exists(file_path):
                 logging.info("昨日 json 数据不存在")
                 self.get_yesterday()
+        if mode in RANGE_BOARD_DAYS:  # 跨天榜单截至昨日，不需要今日数据
+            return
         logging.info("重载今日数据")
         # 为降低时间复杂度，重载今日数据不需要刷新 rp 和 problemStat，后续会根据昨日排名和今日提交计算出
-        today_submissions = fetch_submissions(self.config, False)
+        if self.config.get_config().get("incremental_sync", False):
+            today_submissions = self.sync_today()
+        else:
+            today_submissions = fetch_submissions(self.config, False)
+        today_submissions = SubmissionTable(today_submissions)  # 计算排名与保存共用同一张表及其索引
         ranking = self.calculate_ranking(today_submissions)
         daily = DailyJson(today_submissions, ranking)
         save_json(self.config, daily, False)
+        with UserIndex(self.config) as index:
+            index.update(daily, get_date_string(False))
+
+    def sync_today(self) -> list[SubmissionData]:
+        """
+        增量同步今日提交：只获取高水位之后的记录，并与本地今日 json 合并
+
+        为了兼容重测导致的评测时间变化，高水位前 sync_window 秒内的记录会被重新获取并覆盖
+        """
+        state = load_sync_state(self.config)
+        try:
+            cached_submissions = load_json(self.config, False).submissions
+        except FileNotFoundError:
+            cached_submissions = None
+
+        if state is None or cached_submissions is None:
+            logging.info("未找到今日同步记录，进行全量同步")
+            submissions = fetch_submissions(self.config, False)
+            since = get_today_timestamp()[0]
+        else:
+            since = state['last_at'] - self.config.get_config().get("sync_window", 600)
+            logging.info(f"从 {datetime.datetime.fromtimestamp(since).strftime('%H:%M:%S')} 开始增量同步")
+            fresh_submissions = fetch_submissions(self.config, False, since)
+            submissions = merge_submissions(cached_submissions, fresh_submissions, since)
+
+        save_sync_state(self.config, max((s.at for s in submissions), default=since))
+        return submissions
 
     def login(self, credentials: dict) -> requests.Session:
-        session = requests.Session()
+        session = create_session(self.config)
         fetch_url(f"{self.url}login", method='post', data=credentials,
                   session=session, allow_redirect=True)
         return session
 
-    def calculate_ranking(self, submissions: list[SubmissionData]) -> list[RankingData]:
+    def calculate_ranking(self, submissions: Sequence[SubmissionData]) -> list[RankingData]:
         logging.info("正在根据昨日排名和今日提交计算当前排名")
-        json_file = f'{self.config.get_config()["id"]}-{get_date_string(True)}.json'
-        file_timestamp = os.stat(
-            os.path.join(self.config.work_dir, "data", json_file)).st_mtime
-        file_path = os.path.join(self.config.work_dir, "data", json_file)
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = json.load(f)
-        ranking = DailyJson.from_json(content).rankings
+        file_path = get_daily_path(self.config, True)
+        file_timestamp = os.stat(file_path).st_mtime
+        ranking = read_daily_file(file_path).rankings  # 后续会修改排名，不使用缓存
         
         # 获取当前配置中的排除规则
         exclude_uid: list = self.config.get_config()["exclude_uid"]
@@ -98,29 +201,68 @@ class HydroHandler(BasicHandler):
         for rank in ranking:
             rank.unrated = int(rank.uid) in exclude_uid
         
-        problem_ac_list: list[tuple[str, str]] = []  # uid, pid
-        for submission in submissions:
-            if submission.at < file_timestamp or submission.verdict != "Accepted":
+        ranking_by_uid = {rank.uid: rank for rank in ranking}
+        problem_ac_set: set[tuple[str, str]] = set()  # uid, pid
+        if not isinstance(submissions, SubmissionTable):
+            submissions = SubmissionTable(submissions)
+        for submission in submissions.by_verdict("Accepted"):
+            if submission.at < file_timestamp:
                 continue
-            if (submission.user.uid, submission.problem_id) in problem_ac_list:
+            if (submission.user.uid, submission.problem_id) in problem_ac_set:
                 continue  # 排除同一道题重复ac
-            problem_ac_list.append((submission.user.uid, submission.problem_id))
-            for rank in ranking:
-                if submission.user.uid == rank.uid:
-                    rank.accepted = str(int(rank.accepted) + 1)
+            problem_ac_set.add((submission.user.uid, submission.problem_id))
+            rank = ranking_by_uid.get(submission.user.uid)
+            if rank is not None:
+                rank.accepted += 1
         # 根据新的 accepted 数量重新排序
         ranking.sort(key=lambda x: x.accepted, reverse=True)
         for i in range(len(ranking)):
             ranking[i].rank = i
         return ranking
 
-    def fetch_user(self, uid: str) -> str:
-        logging.info(f"正在获取用户 {uid} 的信息")
-        self.begin_session()
+    def _get_user_profile(self, index: UserIndex, uid: str) -> UserData | None:
+        """优先使用未过期 (profile_ttl 秒内) 的缓存；刷新失败时退回到过期的缓存"""
+        cached = index.get_profile(uid)
+        now = datetime.datetime.now().timestamp()
+        if cached is not None and now - cached[1] < self.config.get_config().get("profile_ttl", 3600):
+            logging.info(f"使用缓存的用户 {uid} 信息")
+            return cached[0]
 
-        user = fetch_user(self.config, uid)
+        try:
+            self.begin_session()
+            user = fetch_user(self.config, uid)
+        except ConnectionError as e:
+            if cached is None:
+                raise
+            logging.warning(f"刷新用户 {uid} 的信息失败，使用过期的缓存: {e}")
+            return cached[0]
         if user is None:
-            return f"UID {uid} 不存在"
+            index.remove_profile(uid)
+        else:
+            index.save_profile(user, now)
+        return user
+
+    def _count_user_submissions(self, uid: str) -> tuple[int, float, int]:
+        total_submissions, score_sum, accepted = 0, 0, 0
+        for submission in load_json(self.config, False).submissions:
+            if submission.user.uid != uid:
+                continue
+            total_submissions += 1
+            score_sum += submission.score
+            if submission.verdict == "Accepted":
+                accepted += 1
+        return total_submissions, score_sum, accepted
+
+    def fetch_user(self, uid: str) -> str:
+        logging.info(f"正在获取用户 {uid} 的信息")
+        with UserIndex(self.config) as index:
+            user = self._get_user_profile(index, uid)
+            if user is None:
+                return f"UID {uid} 不存在"
+            # 今日提交统计在同步时按 uid 建立，尚未建立时再读取今日数据
+            user_stats = index.get_user_stats(uid, get_date_string(False))
+        if user_stats is None:
+            user_stats = self._count_user_submissions(uid)
 
         basic_fields = [['邮箱', user.mail.replace('.', '. ')],
                         ['QQ号', user.qq],
@@ -130,19 +272,10 @@ class HydroHandler(BasicHandler):
         result_text = f'用户 {user.name} 的信息如下：\n'
         result_text += ''.join([f'{name}：{val}\n' for [name, val] in basic_fields if val is not None and len(val) > 0])
 
-        submission_info = [submission for submission in load_json(self.config, False).submissions if
-                           submission.user.uid == uid]
-        total_submissions = 0
-        avg_score = 0
-        ac_rate = 0
-        for submission in submission_info:
-            total_submissions += 1
-            avg_score += submission.score
-            if submission.verdict == "Accepted":
-                ac_rate += 1
+        total_submissions, score_sum, accepted = user_stats
         if total_submissions != 0:
-            formatted_avg_score = '{:.2f}'.format(avg_score / total_submissions)
-            formatted_ac_rate = '{:.2f}'.format(ac_rate / total_submissions * 100)
+            formatted_avg_score = '{:.2f}'.format(score_sum / total_submissions)
+            formatted_ac_rate = '{:.2f}'.format(accepted / total_submissions * 100)
             result_text += (f'\n今日提交信息：\n'
                             f'提交次数：{total_submissions}\n'
                             f'平均分数：{formatted_avg_score}\n'
@@ -1,4 +1,5 @@
 import logging
+from contextlib import closing
 
 from dateutil.parser import isoparse
 
@@ -6,10 +7,10 @@ from module.Hydro.verdict import STATUS_VERDICT
 from module.config import Config
 from module.structures import SubmissionData, UserData
 from module.utils import get_today_timestamp, get_yesterday_timestamp
-from module.utils import json_headers, fetch_url
+from module.utils import json_headers, fetch_url, iter_pages
 
 
-def fetch_submissions(config: Config, is_yesterday: bool) -> list[SubmissionData]:
+def fetch_submissions(config: Config, is_yesterday: bool, since: int | None = None) -> list[SubmissionData]:
     time_str = "昨日" if is_yesterday else "今日"
     logging.info(f"开始获取{time_str}提交记录")
     result = []
@@ -17,52 +18,60 @@ def fetch_submissions(config: Config, is_yesterday: bool) -> list[SubmissionData
         time_start, time_end = get_yesterday_timestamp()
     else:
         time_start, time_end = get_today_timestamp()
+    if since is not None:  # 增量同步：只获取 since 之后的记录
+        time_start = max(time_start, since)
     out_of_date = False
-    page = 1
-    submission_headers = json_headers.copy()
     if "session" not in config.get_config() or config.get_config()["session"] is None:
         raise Exception("登录信息无效，请重试")
-    submission_headers['Cookie'] = (
-        f'sid={config.get_config()["session"].cookies.get_dict()["sid"]};'
-        f'sid.sig={config.get_config()["session"].cookies.get_dict()["sid.sig"]};'
-    )
-    while not out_of_date:
+    session = config.get_config()["session"]
+    users: dict[str, UserData] = {}  # 同一用户的提交共享同一个 UserData
+    # 同时在途的页面数，越过 time_start 后剩余的页面请求会被取消
+    page_concurrency = config.get_config().get("page_concurrency", 1)
+
+    def fetch_page(page: int) -> dict:
         url = config.get_config()["url"] + f'record?all=1&page={page}'
-        response_json = fetch_url(url, method='get', headers=submission_headers).json()
-        record_json = response_json['rdocs']
-        user_json = response_json['udict']
-        problem_json = response_json['pdict']
-        if not record_json:  # fix: 修复没有前一天数据时导致的死循环
-            break
-        for submission in record_json:
-            if submission['lang'] == '-' or ('contest' in submission
-                                             and submission['contest'] == '000000000000000000000000'):
-                # 自测提交记录，不计入
-                continue
-            if "hackTarget" in submission:
-                # hack记录，不计入
-                continue
-            if "judgeAt" not in submission or submission['judgeAt'] is None:
-                # pending or 异常数据，不计入
-                continue
-            submission_timestamp = isoparse(submission['judgeAt']).timestamp()
-            if submission_timestamp > time_end:
-                # 不在记录时域范围内
-                continue
-            if submission_timestamp < time_start:
-                out_of_date = True
+        return fetch_url(url, method='get', headers=json_headers, session=session).json()
+
+    with closing(iter_pages(fetch_page, page_concurrency)) as pages:
+        for response_json in pages:
+            record_json = response_json['rdocs']
+            user_json = response_json['udict']
+            problem_json = response_json['pdict']
+            if not record_json:  # fix: 修复没有前一天数据时导致的死循环
+                break
+            for submission in record_json:
+                if submission['lang'] == '-' or ('contest' in submission
+                                                 and submission['contest'] == '000000000000000000000000'):
+                    # 自测提交记录，不计入
+                    continue
+                if "hackTarget" in submission:
+                    # hack记录，不计入
+                    continue
+                if "judgeAt" not in submission or submission['judgeAt'] is None:
+                    # pending or 异常数据，不计入
+                    continue
+                submission_timestamp = isoparse(submission['judgeAt']).timestamp()
+                if submission_timestamp > time_end:
+                    # 不在记录时域范围内
+                    continue
+                if submission_timestamp < time_start:
+                    out_of_date = True
+                    break
+                uid = str(submission['uid'])
+                if uid not in users:
+                    name = user_json[uid]['uname']
+                    # 保持与排行榜用户名显示一样的逻辑
+                    if 'displayName' in user_json[uid]:
+                        name = f"{user_json[uid]['displayName']} ({name})"
+                    users[uid] = UserData(name, uid)
+                user = users[uid]
+                score = submission['score']
+                verdict = STATUS_VERDICT[submission['status']]
+                problem_id = str(submission['pid'])
+                problem_name = problem_json[problem_id]['title']
+                at = int(submission_timestamp)
+                result.append(SubmissionData(user, score, verdict, problem_id, problem_name, at,
+                                             str(submission['_id'])))
+            if out_of_date:
                 break
-            uid = str(submission['uid'])
-            name = user_json[uid]['uname']
-            # 保持与排行榜用户名显示一样的逻辑
-            if 'displayName' in user_json[uid]:
-                name = f"{user_json[uid]['displayName']} ({name})"
-            user = UserData(name, uid)
-            score = submission['score']
-            verdict = STATUS_VERDICT[submission['status']]
-            problem_id = str(submission['pid'])
-            problem_name = problem_json[problem_id]['title']
-            at = int(submission_timestamp)
-            result.append(SubmissionData(user, score, verdict, problem_id, problem_name, at))
-        page += 1
     return result
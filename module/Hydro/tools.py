@@ -12,13 +12,10 @@ def reload_stats(config: Config, oj_url: str, req_type: str):
     rp_headers = json_headers.copy()
     if "session" not in config.get_config() or config.get_config()["session"] is None:
         raise Exception("登录信息无效，请重试")
-    rp_headers['Cookie'] = (
-        f'sid={config.get_config()["session"].cookies.get_dict()["sid"]};'
-        f'sid.sig={config.get_config()["session"].cookies.get_dict()["sid.sig"]};'
-    )
+    session = config.get_config()["session"]
     rp_headers['Content-Type'] = 'application/json'
     data = f'{{"args":"","id":"{req_type}"}}'
-    response_create_task = fetch_url(url, method='post', headers=rp_headers, data=data)
+    response_create_task = fetch_url(url, method='post', headers=rp_headers, data=data, session=session)
     record_id = response_create_task.json()["rid"]
     logging.debug(f'截取到 record id：{record_id}，类型：{req_type}')
     start_time = time.time()
@@ -28,7 +25,8 @@ def reload_stats(config: Config, oj_url: str, req_type: str):
             logging.error(f'请求刷新 {req_type} 时超时(60s)')
             raise Exception("请求刷新时超时")
         time.sleep(1)
-        response_get_status = fetch_url(oj_url + f'record/{record_id}', method='get', headers=rp_headers)
+        response_get_status = fetch_url(oj_url + f'record/{record_id}', method='get', headers=rp_headers,
+                                        session=session)
         status = response_get_status.json()["rdoc"]["status"]
         logging.debug(f'当前 {req_type} 状态为：{status}')
     logging.info(f'重新加载 {req_type} 数据完成')
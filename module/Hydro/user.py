@@ -26,14 +26,9 @@ def fetch_user(config: Config, uid: str) -> UserData | None:
     # 避免普通用户被某些插件干 403
     if "session" not in config.get_config() or config.get_config()["session"] is None:
         raise Exception("登录信息无效，请重试")
-    user_headers = {
-        'Cookie': (
-            f'sid={config.get_config()["session"].cookies.get_dict()["sid"]};'
-            f'sid.sig={config.get_config()["session"].cookies.get_dict()["sid.sig"]};'
-        )
-    }
+    session = config.get_config()["session"]
     url = config.get_config()["url"] + f'user/{uid}'
-    response_text = fetch_url(url, method='get', headers=user_headers, accept_codes=[200, 404])
+    response_text = fetch_url(url, method='get', accept_codes=[200, 404], session=session)
     if response_text.status_code == 404:
         return None
 
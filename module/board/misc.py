@@ -1,21 +1,31 @@
 import logging
 import math
+import multiprocessing
+import os
+import random
 import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Iterator
 
 import pixie
-from easy_pixie import darken_color, hex_to_color, change_alpha, StyledString, Loc, draw_text, draw_img, \
-    calculate_height, GradientColor, tuple_to_color, calculate_width, draw_gradient_rect, \
-    GradientDirection, draw_rect, pick_gradient_color, draw_mask_rect
+from easy_pixie import darken_color, hex_to_color, change_alpha, Loc, draw_img, calculate_height, GradientColor, \
+    tuple_to_color, draw_gradient_rect, GradientDirection, draw_rect, pick_gradient_color, draw_mask_rect
 
 from module.board.model import RenderableSection, Renderer, RenderableSectionBundle, MultiColumnRenderableSection
+from module.board.strip import RecordingCanvas
+from module.board.text import StyledString, draw_text, calculate_width
 from module.config import Config
 from module.constants import VERSION_INFO
+from module.history import HistoryStore, RANGE_BOARD_DAYS, get_date_range
+from module.render_cache import RenderCache, hash_inputs
 from module.structures import SubmissionData, RankingData
-from module.submission import rank_by_verdict, get_first_ac, classify_by_verdict, get_hourly_submissions, \
-    get_most_popular_problem, count_users_submitted
-from module.utils import rand_tips, load_json, get_date_string
+from module.submission import SubmissionStatistics
+from module.utils import rand_tips, load_json, get_date_string, get_daily_path, use_random, derive_seed
 from module.verdict import ALIAS_MAP
 
 _CONTENT_WIDTH = 1248
@@ -29,6 +39,13 @@ _BOTTOM_PADDING = 158
 _SIDE_PADDING = 128
 _COLUMN_PADDING = 32
 _SECTION_PADDING = 108
+_TILE_ATLAS_SIZE = 128
+_BACKGROUND_TILE_HEIGHT = 2048
+
+_RANGE_BOARD_NAMES = {"weekly": "近七日", "monthly": "近三十日"}
+
+# 不影响图片内容的配置项，不计入渲染缓存的键
+_RENDER_CACHE_IGNORED_KEYS = {"session", "statistic_file", "credentials"}
 
 
 @dataclass
@@ -46,13 +63,16 @@ class MiscBoard:
     users_submitted: int
 
 
-def generate_board_data(submissions: list[SubmissionData], verdict: str) -> MiscBoard:
+def generate_board_data(submissions: list[SubmissionData], verdict: str, bucket_minutes: int = 60,
+                        utc_offset: float | None = None) -> MiscBoard:
     result = {}
+    # 所有统计量在同一次遍历中得到
+    statistics = SubmissionStatistics(submissions, bucket_minutes=bucket_minutes, utc_offset=utc_offset)
 
-    verdict_desc = rank_by_verdict(submissions).get(verdict)
+    verdict_desc = statistics.rank_by_verdict().get(verdict)
     if verdict_desc is None:
         return MiscBoard("", [], _pack_verdict_rank_data(None, verdict),
-                         0, get_first_ac(submissions), {}, 0, 0, {},
+                         0, statistics.get_first_ac(), {}, 0, 0, {},
                          ("", 0), 0)
 
     result['play_of_the_oj'] = next(iter(verdict_desc))  # 昨日
@@ -60,13 +80,13 @@ def generate_board_data(submissions: list[SubmissionData], verdict: str) -> Misc
     result['top_five'] = _slice_rank_data(total_board, 5)  # 昨日
     result['total_board'] = total_board  # 昨日 / 今日
     result['total_submits'] = len(submissions)  # 昨日 / 今日
-    result['first_ac'] = get_first_ac(submissions)  # 昨日 / 今日
-    result['verdict_data'] = classify_by_verdict(submissions)  # 昨日 / 今日
+    result['first_ac'] = statistics.get_first_ac()  # 昨日 / 今日
+    result['verdict_data'] = statistics.classify_by_verdict()  # 昨日 / 今日
     result['avg_score'] = result['verdict_data']['avg_score']  # 昨日 / 今日
     result['ac_rate'] = result['verdict_data']['ac_rate']  # 昨日 / 今日
-    result['hourly_data'] = get_hourly_submissions(submissions)  # 昨日 / 今日
-    result['popular_problem'] = get_most_popular_problem(submissions)  # 昨日 / 今日
-    result['users_submitted'] = count_users_submitted(submissions)  # 昨日 / 今日
+    result['hourly_data'] = statistics.get_hourly_submissions()  # 昨日 / 今日
+    result['popular_problem'] = statistics.get_most_popular_problem()  # 昨日 / 今日
+    result['users_submitted'] = statistics.count_users_submitted()  # 昨日 / 今日
 
     board = MiscBoard(play_of_the_oj=result['play_of_the_oj'], top_five=result['top_five'],
                       total_board=result['total_board'], total_submits=result['total_submits'],
@@ -77,6 +97,46 @@ def generate_board_data(submissions: list[SubmissionData], verdict: str) -> Misc
     return board
 
 
+def generate_range_board_data(history: HistoryStore, date_start: str, date_end: str, verdict: str,
+                              bucket_minutes: int = 60, utc_offset: float | None = None) -> MiscBoard:
+    """跨天榜单的统计量由历史库按索引聚合得到，不逐条载入提交，结果与对同一范围调用 generate_board_data 一致"""
+    statistics = SubmissionStatistics([], bucket_minutes=bucket_minutes, utc_offset=utc_offset)
+    verdict_rank = history.rank_by_verdict(date_start, date_end, verdict)
+    first_ac = history.first_accepted(date_start, date_end) or statistics.get_first_ac()
+    if len(verdict_rank) == 0:
+        return MiscBoard("", [], _pack_verdict_rank_data(None, verdict),
+                         0, first_ac, {}, 0, 0, {},
+                         ("", 0), 0)
+
+    verdict_desc = {name: (earliest, cnt) for name, earliest, cnt in verdict_rank}
+    total_board = _pack_verdict_rank_data(verdict_desc, verdict)
+    # 时间分布、verdict 统计与分数由同一次聚合得到
+    time_counts = history.count_by_time(date_start, date_end, math.gcd(bucket_minutes * 60, 900))
+    total_submits, score_sum = 0, 0
+    verdicts: dict[str, int] = {}
+    latest: dict[str, int] = {}
+    for slot, slot_verdict, count, slot_score, slot_latest in time_counts:
+        total_submits += count
+        score_sum += slot_score
+        verdicts[slot_verdict] = verdicts.get(slot_verdict, 0) + count
+        latest[slot_verdict] = max(latest.get(slot_verdict, slot_latest), slot_latest)
+    statistics.add_time_counts((slot, count if slot_verdict == 'Accepted' else 0, count)
+                               for slot, slot_verdict, count, _, _ in time_counts)
+    verdict_data = {
+        "avg_score": score_sum / total_submits,
+        "ac_rate": verdicts.get('Accepted', 0) / total_submits,
+        "verdicts": dict(sorted(verdicts.items(), key=lambda item: -latest[item[0]]))  # 按首次出现的顺序
+    }
+
+    return MiscBoard(play_of_the_oj=next(iter(verdict_desc)), top_five=_slice_rank_data(total_board, 5),
+                     total_board=total_board, total_submits=total_submits,
+                     first_ac=first_ac, verdict_data=verdict_data,
+                     avg_score=verdict_data['avg_score'], ac_rate=verdict_data['ac_rate'],
+                     hourly_data=statistics.get_hourly_submissions(),
+                     popular_problem=history.most_popular_problem(date_start, date_end),
+                     users_submitted=history.count_users(date_start, date_end))
+
+
 def _slice_rank_data(rank: list[dict], lim: int, show_unrated: bool = True) -> list[dict]:
     """针对有排名并列时的切片"""
     if len(rank) == 0:
@@ -95,8 +155,17 @@ def _slice_rank_data(rank: list[dict], lim: int, show_unrated: bool = True) -> l
     return sliced_data
 
 
+def _page_rank_data(rank: list[dict], page_size: int, page: int) -> list[dict]:
+    """分页切片：第 page 页为名次在 ((page - 1) * page_size, page * page_size] 内的行，与 _slice_rank_data 一样不拆开并列"""
+    return [rank_data for rank_data in rank if (page - 1) * page_size < rank_data['rank'] <= page * page_size]
+
+
+def _count_rank_pages(rank: list[dict], page_size: int) -> int:
+    return max(1, math.ceil(rank[-1]['rank'] / page_size)) if len(rank) > 0 else 1
+
+
 def _pack_rank_data(rank: list[RankingData], lim: int, show_unrated: bool) -> list[dict]:
-    rank_by_ac = sorted(rank, key=lambda x: int(x.accepted), reverse=True)
+    rank_by_ac = sorted(rank, key=lambda x: x.accepted, reverse=True)
     rank_data = []
     rank, last_ac, unrated_cnt = 1, -1, 0
 
@@ -118,10 +187,11 @@ def _pack_verdict_rank_data(verdict_desc: dict | None, verdict: str, lim: int =
         return []
 
     total_board = []
-    rank = 1
+    rank, last_cnt = 1, None
     for i, (user, verdict_cnt) in enumerate(verdict_desc.items()):
-        if i > 0 and verdict_cnt[1] != verdict_desc[list(verdict_desc.keys())[i - 1]][1]:
+        if i > 0 and verdict_cnt[1] != last_cnt:
             rank = i + 1
+        last_cnt = verdict_cnt[1]
         total_board.append({"user": user, f"{verdict}": verdict_cnt, "rank": rank})
 
     if lim >= 0:
@@ -151,6 +221,34 @@ def _ellipsize_str(origin: any, limit: int) -> str:
     return data[:(limit - 1) // 2] + "..." + data[-((limit - 1) // 2):]
 
 
+class _TileAtlas:
+    """进程内共享的排行 tile 图集：宽度与配色相同的 tile 只绘制一次，超出容量时淘汰最久未使用的"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._tiles: OrderedDict[tuple, pixie.Image] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, width: int, colors: GradientColor) -> pixie.Image:
+        style = (width, tuple(colors.color_list), tuple(colors.pos_list))
+        with self._lock:
+            tile = self._tiles.get(style)
+            if tile is not None:
+                self._tiles.move_to_end(style)
+                return tile
+        tile = pixie.Image(width, _RANK_TILE_HEIGHT)
+        draw_gradient_rect(tile, Loc(0, 0, width, _RANK_TILE_HEIGHT), colors,
+                           GradientDirection.HORIZONTAL, _RANK_TILE_HEIGHT // 2)
+        with self._lock:
+            self._tiles[style] = tile
+            while len(self._tiles) > self.max_size:
+                self._tiles.popitem(last=False)
+        return tile
+
+
+_tile_atlas = _TileAtlas(_TILE_ATLAS_SIZE)
+
+
 def _make_watermark(img: pixie.Image, width: int, height: int):
     cp = StyledString(
         "©2023-2026 P.B.G. Dev Team.", 'H', 16, font_color=(0, 0, 0, 72)
@@ -228,18 +326,23 @@ class _RankSection(RenderableSection):
         pos_list = [0.0, 0.5, 1.0]
         return GradientColor(color_list, pos_list, '')
 
-    def _decode_rank_data(self, rank_data: list[dict], rank_key: str) -> list[dict]:
+    def _decode_rank_data(self, rank_data: list[dict], rank_key: str,
+                          scale_data: list[dict] | None = None) -> list[dict]:
         if len(rank_data) == 0:
             return []
 
+        if scale_data is None:
+            scale_data = rank_data
         show_unrated = self.config.get_config()['show_unrated']
-        max_val = int(rank_data[0][rank_key][-1]
-                      if isinstance(rank_data[0][rank_key], tuple) else
-                      rank_data[0][rank_key])
-        min_val = int(rank_data[-1][rank_key][-1]
-                      if isinstance(rank_data[-1][rank_key], tuple) else
-                      rank_data[-1][rank_key])
+        max_val = int(scale_data[0][rank_key][-1]
+                      if isinstance(scale_data[0][rank_key], tuple) else
+                      scale_data[0][rank_key])
+        min_val = int(scale_data[-1][rank_key][-1]
+                      if isinstance(scale_data[-1][rank_key], tuple) else
+                      scale_data[-1][rank_key])
         color_black = tuple_to_color((0, 0, 0))
+        # tile 宽度按 tile_width_step 取整，使不同板块、不同次渲染间可以复用图集中的 tile，不大于 1 时不取整
+        width_step = self.config.get_config().get("tile_width_step", 8)
         pre_rank = ""
         render_material = []
 
@@ -270,6 +373,8 @@ class _RankSection(RenderableSection):
             )
             tile_progress = (val - min_val + 1) / (max_val - min_val + 1)
             tile_width = _RANK_TILE_BASE_WIDTH + _RANK_TILE_STRETCH_WIDTH * tile_progress
+            if width_step > 1:
+                tile_width = round(tile_width / width_step) * width_step
             tile_gradient_color = self._get_tile_gradient_color(unrated, same_rank)
 
             render_material.append({
@@ -282,28 +387,16 @@ class _RankSection(RenderableSection):
 
         return render_material
 
-    def _cache_tiles(self, tile_loc: Loc, tile_colors: GradientColor):
-        """缓存相同样式的tile，不在全局缓存的原因是不同板块的tile长度很难一致"""
-        tile_style = (int(tile_loc.width),
-                      tuple(tile_colors.color_list), tuple(tile_colors.pos_list))
-        self._tiles_cache.setdefault(tile_style, [])
-        self._tiles_cache[tile_style].append((tile_loc.x, tile_loc.y))
-
-    def _render_tiles(self, img: pixie.Image):
-        for tile_style, tiles in self._tiles_cache.items():
-            tile_width, color_list, pos_list = tile_style
-            temp_img = pixie.Image(tile_width, _RANK_TILE_HEIGHT)
-            draw_gradient_rect(temp_img, Loc(0, 0, tile_width, _RANK_TILE_HEIGHT),
-                               GradientColor(list(color_list), list(pos_list), ''),
-                               GradientDirection.HORIZONTAL, _RANK_TILE_HEIGHT // 2)
-            for tile in tiles:
-                tile_x, tile_y = tile
-                draw_img(img, temp_img, Loc(tile_x, tile_y, tile_width, _RANK_TILE_HEIGHT))
+    @classmethod
+    def _render_tiles(cls, img: pixie.Image, tiles: list[tuple[int, int, int, GradientColor]]):
+        for tile_x, tile_y, tile_width, tile_colors in tiles:
+            img.draw(_tile_atlas.get(tile_width, tile_colors), pixie.translate(tile_x, tile_y))
 
     def __init__(self, config: Config, header: str, title: str,
                  rank_data: list[dict], rank_key: str = "Accepted",
                  hint: str = None, top_count: int = -1,
-                 separate_columns: bool = False):
+                 separate_columns: bool = False, scale_data: list[dict] | None = None):
+        """scale_data 为 tile 长度的缩放基准，默认为 rank_data 本身；分页时传入完整榜单，使各页长度一致"""
         super().__init__(config)
         self._max_col_count = 3 if separate_columns else 1
         self.str_header = StyledString(
@@ -318,11 +411,12 @@ class _RankSection(RenderableSection):
         self.str_tops = StyledString(
             f"Top {top_count}th", "H", 48, padding_bottom=(24 if hint else 16)
         ) if top_count != -1 else None
-        self.section_render_materials = self._decode_rank_data(rank_data, rank_key)
-        self._tiles_cache = {}
+        self.section_render_materials = self._decode_rank_data(rank_data, rank_key, scale_data)
+        self._columns = min(self._max_col_count, 1 + len(self.section_render_materials) // 32)
+        self._height = None  # 空榜单不会被渲染，首次需要时再测量
 
     def get_columns(self):
-        return min(self._max_col_count, 1 + len(self.section_render_materials) // 32)
+        return self._columns
 
     def render(self, img: pixie.Image, x: int, y: int) -> int:
         current_x, current_y = x, y
@@ -339,12 +433,12 @@ class _RankSection(RenderableSection):
         if self.str_hint:
             current_y = draw_text(img, self.str_hint, current_x, current_y)
 
-        column_count = math.ceil(len(self.section_render_materials) / self.get_columns())
+        column_count = math.ceil(len(self.section_render_materials) / self._columns)
         start_x, max_y, start_y = current_x, current_y, current_y
+        tiles = []
         for idx, item in enumerate(self.section_render_materials):
             current_x = start_x
-            self._cache_tiles(Loc(current_x, current_y + 38, item['tile_width'], 52),
-                              item['tile_gradient_color'])
+            tiles.append((current_x, current_y + 38, int(item['tile_width']), item['tile_gradient_color']))
             current_x += 32
 
             draw_text(img, item['str_rank'], current_x, current_y + 8)
@@ -363,14 +457,14 @@ class _RankSection(RenderableSection):
 
         current_y = max_y - 32  # 最后一项有多余底边距
 
-        self._render_tiles(img)
+        self._render_tiles(img, tiles)
         return current_y
 
-    def get_height(self):
+    def _measure_height(self) -> int:
         height = calculate_height([self.str_header, self.str_title, self.str_tops, self.str_hint])
         if self.str_tops:
             height -= 102 if self.str_hint else 86
-        column_count = math.ceil(len(self.section_render_materials) / self.get_columns())
+        column_count = math.ceil(len(self.section_render_materials) / self._columns)
         column_split = [self.section_render_materials[i:i + column_count]
                         for i in range(0, len(self.section_render_materials), column_count)]
         height += max(calculate_height([item['str_value'] for item in column]) +
@@ -378,6 +472,11 @@ class _RankSection(RenderableSection):
                       for column in column_split)
         return height
 
+    def get_height(self):
+        if self._height is None:
+            self._height = self._measure_height()
+        return self._height
+
 
 class _SubmitDetailSection(RenderableSection):
 
@@ -494,23 +593,27 @@ class _HistogramSection(RenderableSection):
         draw_rect(img, self._outline_paint, Loc(current_x, current_y + 4, 4, 20))
         draw_rect(img, self._outline_paint, Loc(current_x, current_y + 260, 24, 4))
         draw_rect(img, self._outline_paint, Loc(current_x, current_y + 240, 4, 20))
-        current_x += 26 - (22 + 14)
+        # 柱宽与间距按区间数缩放，保持 24 个区间时的总宽度
+        scale = 24 / max(len(self.section_render_material), 1)
+        tile_width, tile_gap = 22 * scale, 14 * scale
+        current_x += 26 - (tile_width + tile_gap)
 
         for item in self.section_render_material:
-            current_x += 22 + 14
+            current_x += tile_width + tile_gap
             tile_height = (_HISTOGRAM_TILE_BASE_HEIGHT +
                            _HISTOGRAM_TILE_STRETCH_HEIGHT * item['hot_prop'])
             sub_tile_height = (_HISTOGRAM_TILE_BASE_HEIGHT +
                                _HISTOGRAM_TILE_STRETCH_HEIGHT * item['hot_prop'] * item['ac_prop'])
 
             draw_rect(img, self._main_tile_paint, Loc(
-                current_x, current_y + 24 + tile_full_height - tile_height, 22, tile_height
-            ), 22)
+                current_x, current_y + 24 + tile_full_height - tile_height, tile_width, tile_height
+            ), tile_width)
             draw_rect(img, self._sub_tile_paint, Loc(
-                current_x, current_y + 24 + tile_full_height - sub_tile_height, 22, sub_tile_height
-            ), 22)
+                current_x, current_y + 24 + tile_full_height - sub_tile_height, tile_width, sub_tile_height
+            ), tile_width)
 
         # 绘制右半边框
+        current_x += tile_width - 22
         draw_rect(img, self._outline_paint, Loc(current_x + 24, current_y, 24, 4))
         draw_rect(img, self._outline_paint, Loc(current_x + 44, current_y + 4, 4, 20))
         draw_rect(img, self._outline_paint, Loc(current_x + 24, current_y + 260, 24, 4))
@@ -548,9 +651,14 @@ class _HourlyDistributionSection(RenderableSection):
         super().__init__(config)
 
         hourly_detail = self._pack_hourly_detail(hourly_data)
-        hourly_text = "" if len(hourly_data) == 0 else (
-            f'提交高峰时段为 {hourly_detail["hot_time"]:02d}:00 - {hourly_detail["hot_time"]:02d}:59. '
-            f'在 {hourly_detail["hot_count"]} 份提交中，通过率为 {hourly_detail["hot_ac"] * 100:.2f}%.')
+        hourly_text = ""
+        if len(hourly_data) > 0:
+            bucket_minutes = 1440 // len(hourly_data)
+            hot_start = hourly_detail["hot_time"] * bucket_minutes
+            hot_end = hot_start + bucket_minutes - 1
+            hourly_text = (f'提交高峰时段为 {hot_start // 60:02d}:{hot_start % 60:02d} - '
+                           f'{hot_end // 60:02d}:{hot_end % 60:02d}. '
+                           f'在 {hourly_detail["hot_count"]} 份提交中，通过率为 {hourly_detail["hot_ac"] * 100:.2f}%.')
 
         self.str_header = StyledString(
             "提交时间分布", 'B', 36, padding_bottom=24
@@ -577,13 +685,18 @@ class _HourlyDistributionSection(RenderableSection):
 
 class _CopyrightSection(RenderableSection):
 
-    def __init__(self, config: Config, gradient_color_name: str):
+    def __init__(self, config: Config, gradient_color_name: str, rng: random.Random | None = None,
+                 generated_at: datetime | None = None):
         super().__init__(config)
+        if generated_at is None:
+            generated_at = datetime.now()
+        self.generated_at = generated_at
         self.str_tips_title = StyledString(
             "Tips:", 'H', 36, padding_bottom=64, font_color=(0, 0, 0, 208)
         )
+        self.tip = rand_tips(config, rng)
         self.str_tips_detail = StyledString(
-            rand_tips(config), 'M', 28, line_multiplier=1.32,
+            self.tip, 'M', 28, line_multiplier=1.32,
             max_width=(_CONTENT_WIDTH - _SIDE_PADDING -  # 考虑右边界，不然画出去了
                        calculate_width(self.str_tips_title) - 12 - 48),
             padding_bottom=64, font_color=(0, 0, 0, 208)
@@ -595,7 +708,7 @@ class _CopyrightSection(RenderableSection):
             VERSION_INFO, 'B', 20, font_color=(0, 0, 0, 208), padding_bottom=24
         )
         self.str_generator_info = StyledString(
-            f'Generated at {datetime.now().strftime("%Y/%m/%d %H:%M:%S")}.\n'
+            f'Generated at {generated_at.strftime("%Y/%m/%d %H:%M:%S")}.\n'
             f'From {config.get_config()["board_name"]}.\n'
             f'{gradient_color_name}.', 'B', 20, line_multiplier=1.32, font_color=(0, 0, 0, 136)
         )
@@ -625,54 +738,130 @@ class _CopyrightSection(RenderableSection):
 class MiscBoardGenerator(Renderer):
 
     def __init__(self, config: Config, board_type: str, img_path: str, verdict: str = "Accepted",
-                 separate_columns: bool = False):
+                 separate_columns: bool = False, seed: int | str | None = None,
+                 generated_at: datetime | None = None, page: int = 1):
+        """
+        :param seed: 渐变色与 tips 的随机种子，留空时读取配置项 render_seed；
+                     为 "auto" 时由榜单 id、日期、类型与 verdict 导出，为 None 时不固定
+        :param generated_at: 图片中的生成时间，留空时固定种子则取今日 (跨天榜单为昨日) 数据的同步时间，否则取当前时间
+        :param page: 配置了 full_board_page_size 时，完整榜单生成第几页
+        """
         super().__init__(config)
-        self._today = load_json(config, False)
+        # 跨天榜单截至昨日，不读取今日数据
+        self._today = None if board_type in RANGE_BOARD_DAYS else load_json(config, False)
+        self._board_type = board_type
+        self._img_path = img_path
+        self._verdict = verdict
         self._separate_columns = separate_columns
-        self._gradient_color = pick_gradient_color()
+        self.page, self.page_count = page, 1  # 生成完整榜单时校正页码并更新页数
+        self.seed = self._resolve_seed(seed)
+        if generated_at is None and self.seed is not None:  # 相同数据的渲染结果逐字节一致
+            generated_at = datetime.fromtimestamp(
+                os.stat(get_daily_path(config, board_type in RANGE_BOARD_DAYS)).st_mtime)
+        rng = random.Random(self.seed)
+        with use_random(rng):
+            self._gradient_color = pick_gradient_color()
         eng_full_name = (f'{get_date_string(board_type == "full", ".")}  '
                          f'{config.get_config()["board_name"]} Rank List')
 
-        self.section_copyright = _CopyrightSection(config, self._gradient_color.name)
-
-        if board_type == "full":  # 对于 full 榜单的图形逻辑
+        self.section_copyright = _CopyrightSection(config, self._gradient_color.name, rng, generated_at)
+
+        if board_type in RANGE_BOARD_DAYS:  # 对于跨天榜单，数据来自历史库
+            date_start, date_end = get_date_range(RANGE_BOARD_DAYS[board_type])
+            with HistoryStore(config) as history:
+                history.backfill(date_start, date_end)
+                self._board = generate_range_board_data(
+                    history, date_start, date_end, verdict,
+                    bucket_minutes=self.config.get_config().get("hourly_bucket_minutes", 60),
+                    utc_offset=self.config.get_config().get("utc_offset"))
+            range_name = _RANGE_BOARD_NAMES[board_type]
+            self._set_title(
+                f"{range_name}卷王天梯榜",
+                f'{date_start.replace("-", ".")} - {date_end.replace("-", ".")}  '
+                f'{config.get_config()["board_name"]} Rank List'
+            )
+            self._collect_range_sections(range_name)
+        elif board_type == "full":  # 对于 full 榜单的图形逻辑
             try:
                 self._yesterday = load_json(config, True)
             except FileNotFoundError:
                 logging.error("未检测到昨日榜单文件，请改用--now参数生成今日榜单")
                 sys.exit(1)
-            self._board = generate_board_data(self._yesterday.submissions, verdict)
-            self.section_title = _TitleSection(
-                config, self._gradient_color.color_list[0], img_path,
+            self._board = self._generate_board_data(self._yesterday.submissions, verdict)
+            self._set_title(
                 "昨日卷王天梯榜", eng_full_name
             )
             self._collect_full_sections()
         else:  # if board_type == "now"  对于 now 榜单的图形逻辑
+            self.page = 1  # 今日榜单不分页
             alias = {val: key for key, val in ALIAS_MAP.items()}
             self._verdict = verdict
             self._verdict_alias = alias[verdict]
             if self._verdict == "Accepted":
-                self.section_title = _TitleSection(
-                    config, self._gradient_color.color_list[0], img_path,
+                self._set_title(
                     "今日当前提交榜单", eng_full_name
                 )
-                self._board = generate_board_data(self._today.submissions, self._verdict)
+                self._board = self._generate_board_data(self._today.submissions, self._verdict)
                 self._collect_now_sections()
             else:
-                self.section_title = _TitleSection(
-                    config, self._gradient_color.color_list[0], img_path,
+                self._set_title(
                     f"今日当前{self._verdict_alias}榜单", eng_full_name
                 )
-                self._board = generate_board_data(self._today.submissions, self._verdict)
+                self._board = self._generate_board_data(self._today.submissions, self._verdict)
                 self._collect_verdict_sections()
 
 
+    def _resolve_seed(self, seed: int | str | None) -> int | None:
+        if seed is None:
+            seed = self.config.get_config().get("render_seed")
+        if seed is None:
+            return None
+        if seed != "auto":
+            return int(seed)
+        if self._board_type in RANGE_BOARD_DAYS:
+            board_date = get_date_range(RANGE_BOARD_DAYS[self._board_type])[1]
+        else:
+            board_date = get_date_string(self._board_type == "full")
+        return derive_seed(self.config.get_config()["id"], board_date, self._board_type, self._verdict)
+
+    def _get_render_workers(self) -> int:
+        return self.config.get_config().get("render_workers") or 1
+
+    def _set_title(self, title: str, subtitle: str):
+        self._title = (title, subtitle)
+        self.section_title = _TitleSection(
+            self.config, self._gradient_color.color_list[0], self._img_path, title, subtitle
+        )
+
+    def _generate_board_data(self, submissions: list[SubmissionData], verdict: str) -> MiscBoard:
+        return generate_board_data(submissions, verdict,
+                                   bucket_minutes=self.config.get_config().get("hourly_bucket_minutes", 60),
+                                   utc_offset=self.config.get_config().get("utc_offset"))
+
+    def _make_full_rank_section(self, title: str) -> RenderableSection:
+        """完整榜单；配置了 full_board_page_size 时只包含第 self.page 页"""
+        total_board = self._board.total_board
+        page_size = self.config.get_config().get("full_board_page_size")
+        if not page_size or len(total_board) == 0:
+            self.page = 1
+            return _RankSection(self.config, "完整榜单", title, total_board,
+                                separate_columns=self._separate_columns)
+
+        page_count = self.page_count = _count_rank_pages(total_board, page_size)
+        if not 1 <= self.page <= page_count:
+            logging.warning(f"完整榜单共 {page_count} 页，第 {self.page} 页不存在，改为生成最后一页")
+            self.page = page_count
+        page_data = _page_rank_data(total_board, page_size, self.page)
+        hint = f'第 {self.page} / {page_count} 页'
+        if len(page_data) == 0:  # 上一页的并列名次占满了本页的名次范围
+            return _SimpleTextSection(self.config, "完整榜单", title, f'{hint}，本页名次与上一页并列')
+        return _RankSection(self.config, "完整榜单", title, page_data, hint=hint,
+                            separate_columns=self._separate_columns, scale_data=total_board)
+
     def _collect_full_sections(self):
         rank_data = _pack_rank_data(self._today.rankings, 10,
                                     self.config.get_config()['show_unrated'])
-        has_ac_submission = len(
-            [s for s in self._yesterday.submissions if s.verdict == "Accepted"]
-        ) > 0
+        has_ac_submission = self._yesterday.submissions.count_verdict("Accepted") > 0
 
         section_submission_none = _SimpleTextSection(self.config, "昨日无AC提交", "记录为空")
         section_ranking_none = _SimpleTextSection(self.config, "当前排行榜为空", "暂无排行")
@@ -711,10 +900,7 @@ class MiscBoardGenerator(Renderer):
             self.config, "训练榜单", "题数排名", rank_data,
             top_count=10, separate_columns=self._separate_columns
         )
-        section_yesterday_full = _RankSection(
-            self.config, "完整榜单", "昨日 OJ 总榜", self._board.total_board,
-            separate_columns=self._separate_columns
-        )
+        section_yesterday_full = self._make_full_rank_section("昨日 OJ 总榜")
 
         section_content: list[RenderableSection] = []
         if not has_ac_submission:
@@ -737,12 +923,51 @@ class MiscBoardGenerator(Renderer):
             self.config, section_content, _CONTENT_WIDTH, _SECTION_PADDING, _COLUMN_PADDING
         )
 
+    def _collect_range_sections(self, range_name: str):
+        has_ac_submission = len(self._board.total_board) > 0
+
+        section_submission_none = _SimpleTextSection(self.config, f"{range_name}无AC提交", "记录为空")
+        section_play_of_the_oj = _SimpleTextSection(
+            self.config, f"{range_name}卷王", self._board.play_of_the_oj
+        )
+        section_top_5 = _RankSection(
+            self.config, "过题数榜单", f"{range_name}过题数", self._board.top_five,
+            top_count=5, separate_columns=self._separate_columns
+        )
+        section_submit_detail = _SubmitDetailSection(
+            self.config, self._board.total_submits, self._board.ac_rate,
+            self._board.users_submitted, self._board.verdict_data.get("verdicts"),
+            avg_score=self._board.avg_score
+        )
+        section_hourly_distribution = _HourlyDistributionSection(
+            self.config, self._board.hourly_data
+        )
+        section_popular_problem = _SimpleTextSection(
+            self.config, f"{range_name}最受欢迎的题目", self._board.popular_problem[0],
+            f'共有 {self._board.popular_problem[1]} 个人提交本题'
+        )
+        section_range_full = self._make_full_rank_section(f"{range_name} OJ 总榜")
+
+        section_content: list[RenderableSection] = []
+        if not has_ac_submission:
+            section_content.append(section_submission_none)
+        else:
+            section_content.extend([
+                section_play_of_the_oj, section_top_5,
+                RenderableSectionBundle(
+                    self.config, [section_submit_detail, section_hourly_distribution],
+                    _SECTION_PADDING
+                ), section_popular_problem, section_range_full
+            ])
+
+        self.section_content = MultiColumnRenderableSection(
+            self.config, section_content, _CONTENT_WIDTH, _SECTION_PADDING, _COLUMN_PADDING
+        )
+
     def _collect_now_sections(self):
         rank_data = _pack_rank_data(self._today.rankings, 5,
                                     self.config.get_config()['show_unrated'])
-        has_ac_submission = len([
-            s for s in self._today.submissions if s.verdict == self._verdict
-        ]) > 0
+        has_ac_submission = self._today.submissions.count_verdict(self._verdict) > 0
 
         section_submission_none = _SimpleTextSection(
             self.config, "记录为空", f"今日无{self._verdict_alias}提交"
@@ -796,10 +1021,8 @@ class MiscBoardGenerator(Renderer):
         )
 
     def _collect_verdict_sections(self):
-        rank_data = _pack_verdict_rank_data(
-            rank_by_verdict([s for s in self._today.submissions if s.verdict == self._verdict])
-            .get(self._verdict)  # {username: submissionCnt}
-            , self._verdict, lim=10)
+        # 只含该 verdict 的提交得到的排行与 total_board 相同，直接切片即可
+        rank_data = _slice_rank_data(self._board.total_board, 10)
 
         section_ranking_none = _SimpleTextSection(
             self.config, "暂无排行", "当前排行榜为空"
@@ -827,28 +1050,187 @@ class MiscBoardGenerator(Renderer):
             self.config, section_content, _CONTENT_WIDTH, _SECTION_PADDING, _COLUMN_PADDING
         )
 
-    def render(self) -> pixie.Image:
+    def cache_key(self) -> str:
+        """影响图片内容的全部输入的哈希；生成时间不计入，命中缓存时图片中保留首次渲染的时间"""
+        return hash_inputs({
+            'version': VERSION_INFO,
+            'board_type': self._board_type,
+            'verdict': self._verdict,
+            'separate_columns': self._separate_columns,
+            'page': self.page,
+            'config': {key: val for key, val in self.config.get_config().items()
+                       if key not in _RENDER_CACHE_IGNORED_KEYS},
+            'logo': [self._img_path, os.stat(self._img_path).st_mtime],
+            'title': self._title,
+            'board': self._board.__dict__,
+            'rankings': self._today.rankings if self._today is not None else None,
+            'tip': self.section_copyright.tip,
+            'gradient': [self._gradient_color.name, self._gradient_color.color_list],
+        })
+
+    def render_to_file(self, path: str):
+        """
+        渲染并写入 path (PNG)；开启渲染缓存时，内容相同的榜单直接复用缓存中的图片
+
+        未固定种子时渐变色与 tips 随机选取，几乎不会命中，不使用缓存
+        """
+        cache = RenderCache.from_config(self.config) if self.seed is not None else None
+        if cache is None:
+            self.render().write_file(path)
+            return
+        key = self.cache_key()
+        content = cache.get(key)
+        if content is not None:
+            logging.info("榜单内容未变化，使用渲染缓存")
+        else:
+            content = cache.put(key, self.render())
+        with open(path, "wb") as f:
+            f.write(content)
+
+    def _get_size(self) -> tuple[int, int]:
+        """背景矩形的宽高，图片四周另有 32 像素的黑边"""
         render_sections = [self.section_title, self.section_content, self.section_copyright]
         max_column = max(section.get_columns() for section in render_sections)
+        return (_CONTENT_WIDTH * max_column + _COLUMN_PADDING * (max_column - 1),
+                sum(section.get_height() for section in render_sections) +
+                _SECTION_PADDING * (len(render_sections) - 1) +
+                _TOP_PADDING + _BOTTOM_PADDING)
 
-        width, height = (_CONTENT_WIDTH * max_column + _COLUMN_PADDING * (max_column - 1),
-                         sum(section.get_height() for section in render_sections) +
-                         _SECTION_PADDING * (len(render_sections) - 1) +
-                         _TOP_PADDING + _BOTTOM_PADDING)
-
-        img = pixie.Image(width + 64, height + 64)
-        img.fill(tuple_to_color((0, 0, 0)))  # 填充黑色背景
-
-        draw_gradient_rect(img, Loc(32, 32, width, height), self._gradient_color,
-                           GradientDirection.DIAGONAL_LEFT_TO_RIGHT, 96)
-        draw_mask_rect(img, Loc(32, 32, width, height), (255, 255, 255, 178), 96)
-
+    def _draw_content(self, img: pixie.Image | RecordingCanvas, width: int, height: int):
         current_x, current_y = _SIDE_PADDING, _TOP_PADDING - _SECTION_PADDING
 
-        for section in render_sections:
+        for section in [self.section_title, self.section_content, self.section_copyright]:
             current_y += _SECTION_PADDING
             current_y = section.render(img, current_x, current_y)
 
         _make_watermark(img, width, height)
 
+    def render(self) -> pixie.Image:
+        width, height = self._get_size()
+        img = pixie.Image(width + 64, height + 64)
+        workers = self._get_render_workers()
+        if workers > 1 and height + 64 > _BACKGROUND_TILE_HEIGHT:
+            _draw_background_parallel(img, self._gradient_color, width, height, workers)
+        else:
+            _draw_background_tiles(img, self._gradient_color, width, height)
+        self._draw_content(img, width, height)
         return img
+
+    def _record_content(self, width: int, height: int) -> RecordingCanvas:
+        canvas = RecordingCanvas(width + 64, height + 64)
+        self._draw_content(canvas, width, height)
+        return canvas
+
+    def _render_strip(self, canvas: RecordingCanvas, width: int, height: int,
+                      offset: int, strip_height: int) -> pixie.Image:
+        img = pixie.Image(width + 64, min(strip_height, height + 64 - offset))
+        _draw_background(img, self._gradient_color, width, height, offset)
+        canvas.replay(img, offset)
+        return img
+
+    def render_strips(self, strip_height: int) -> Iterator[pixie.Image]:
+        """
+        分条渲染：排版与绘制调用只进行一次，之后按 strip_height 逐条产出图片，依次拼接即为完整榜单
+
+        同一时间只保留一个条带，内存占用不随榜单长度增长
+        """
+        width, height = self._get_size()
+        canvas = self._record_content(width, height)
+        for offset in range(0, height + 64, strip_height):
+            yield self._render_strip(canvas, width, height, offset, strip_height)
+
+    def render_strips_to_files(self, path: str, strip_height: int) -> list[str]:
+        """分条渲染并依次写入 {path 去掉扩展名}-{序号}{扩展名}，序号从 1 开始，返回写入的路径"""
+        root, extension = os.path.splitext(path)
+        paths = []
+        for idx, img in enumerate(self.render_strips(strip_height)):
+            paths.append(f'{root}-{idx + 1}{extension}')
+            img.write_file(paths[-1])
+        return paths
+
+
+def _draw_background(img: pixie.Image, gradient_color: GradientColor, width: int, height: int, offset: int = 0):
+    """绘制背景中纵坐标从 offset 开始、高为 img.height 的部分"""
+    img.fill(tuple_to_color((0, 0, 0)))  # 填充黑色背景
+
+    draw_gradient_rect(img, Loc(32, 32 - offset, width, height), gradient_color,
+                       GradientDirection.DIAGONAL_LEFT_TO_RIGHT, 96)
+    if offset == 0 and img.height >= height + 64:
+        draw_mask_rect(img, Loc(32, 32, width, height), (255, 255, 255, 178), 96)
+        return
+    # 蒙版只需覆盖条带内的部分
+    mask_top, mask_bottom = max(32, offset), min(32 + height, offset + img.height)
+    if mask_top >= mask_bottom:
+        return
+    paint_mask = pixie.Paint(pixie.SOLID_PAINT)
+    paint_mask.color = tuple_to_color((255, 255, 255, 178))
+    mask = pixie.Image(width, mask_bottom - mask_top)
+    draw_rect(mask, paint_mask, Loc(0, 32 - mask_top, width, height), 96)
+    img.draw(mask, pixie.translate(32, mask_top - offset))
+
+
+def _draw_background_tiles(img: pixie.Image, gradient_color: GradientColor, width: int, height: int,
+                           offset: int = 0):
+    """
+    按 _BACKGROUND_TILE_HEIGHT 分块绘制背景中纵坐标从 offset 开始的部分，offset 须为分块高度的整数倍
+
+    分块位置只与背景尺寸有关，串行与多进程渲染的背景逐字节一致；背景不高于一个分块时与整体绘制相同
+    """
+    total_height = height + 64
+    for tile_offset in range(offset, min(offset + img.height, total_height), _BACKGROUND_TILE_HEIGHT):
+        tile = pixie.Image(width + 64, min(_BACKGROUND_TILE_HEIGHT, total_height - tile_offset))
+        _draw_background(tile, gradient_color, width, height, tile_offset)
+        img.draw(tile, pixie.translate(0, tile_offset - offset))
+
+
+def _split_bands(total_height: int, count: int) -> list[tuple[int, int]]:
+    """将高为 total_height 的图片按整块背景分块纵向均分为至多 count 条，返回各条的 (起始纵坐标, 高度)"""
+    tiles = -(-total_height // _BACKGROUND_TILE_HEIGHT)
+    band_height = -(-tiles // count) * _BACKGROUND_TILE_HEIGHT
+    return [(offset, min(band_height, total_height - offset)) for offset in range(0, total_height, band_height)]
+
+
+def _render_background_band(gradient_color: GradientColor, width: int, height: int,
+                            offset: int, band_height: int, path: str) -> str:
+    """在子进程中绘制一条背景并写入 path，参数均可序列化"""
+    img = pixie.Image(width + 64, band_height)
+    _draw_background_tiles(img, gradient_color, width, height, offset)
+    img.write_file(path)
+    return path
+
+
+_render_pool: tuple[int, ProcessPoolExecutor] | None = None
+_render_pool_lock = threading.Lock()
+
+
+def _get_render_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    进程内共享的渲染进程池，在多次渲染间复用
+
+    使用 spawn 方式启动子进程：常驻服务是多线程进程，fork 可能复制其他线程持有的锁
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None or _render_pool[0] != workers:
+            if _render_pool is not None:
+                _render_pool[1].shutdown(wait=False)
+            _render_pool = workers, ProcessPoolExecutor(max_workers=workers,
+                                                        mp_context=multiprocessing.get_context("spawn"))
+        return _render_pool[1]
+
+
+def _draw_background_parallel(img: pixie.Image, gradient_color: GradientColor, width: int, height: int,
+                              workers: int):
+    """
+    多进程绘制背景：背景按整块纵向均分为至多 workers 条，各条在进程池中绘制并写入临时文件，再按位置拼接
+
+    背景是渲染中最耗时的部分；各分块的内容在本进程中排版与绘制，子进程无需重建生成器
+    """
+    bands = _split_bands(height + 64, workers)
+    with tempfile.TemporaryDirectory() as directory:
+        pool = _get_render_pool(workers)
+        futures = [pool.submit(_render_background_band, gradient_color, width, height, offset, band_height,
+                               os.path.join(directory, f'{idx}.qoi'))
+                   for idx, (offset, band_height) in enumerate(bands)]
+        for (offset, _), future in zip(bands, futures):
+            img.draw(pixie.read_image(future.result()), pixie.translate(0, offset))
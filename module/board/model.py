@@ -74,9 +74,13 @@ class RenderableSectionBundle(RenderableSection):
         super().__init__(config)
         self._section_padding = section_padding
         self.section_bundle = sections
+        # 子分块在构造后不再变化，栏数与高度只计算一次
+        self._columns = max([section.get_columns() for section in self.section_bundle])
+        self._height = (sum([section.get_height() for section in self.section_bundle]) +
+                        self._section_padding * (len(self.section_bundle) - 1))
 
     def get_columns(self):
-        return max([section.get_columns() for section in self.section_bundle])
+        return self._columns
 
     def render(self, img: pixie.Image, x: int, y: int) -> int:
         current_x, current_y = x, y
@@ -89,8 +93,7 @@ class RenderableSectionBundle(RenderableSection):
         return current_y
 
     def get_height(self):
-        return (sum([section.get_height() for section in self.section_bundle]) +
-                self._section_padding * (len(self.section_bundle) - 1))
+        return self._height
 
 
 class MultiColumnRenderableSection(RenderableSection):
@@ -104,39 +107,46 @@ class MultiColumnRenderableSection(RenderableSection):
         self._column_padding = column_padding
         self.section_bundle = sections
 
+        # 排版只进行一次：每个子分块的栏数与高度各测量一次，之后的分栏与高度计算都复用测量结果
+        self._sections_columns = [section.get_columns() for section in self.section_bundle]
+        self._sections_height = [section.get_height() for section in self.section_bundle]
+        self._columns = max(self._sections_columns)
         self._sections_col_id = [0 for _ in range(len(self.section_bundle))]
 
-        one_column_heights = [section.get_height() for section in self.section_bundle
-                               if section.get_columns() == 1]
-        one_column_height = max(sum(one_column_heights) // self.get_columns(),
+        one_column_heights = [height for height, columns in zip(self._sections_height, self._sections_columns)
+                              if columns == 1]
+        one_column_height = max(sum(one_column_heights) // self._columns,
                                 max(one_column_heights))  # 保证至少能塞下一个
 
         current_col, current_height = 0, 0  # 分栏（策略：第一栏可以超出，后面不超出第一栏）
-        for idx, section in enumerate(self.section_bundle):
-            if section.get_columns() > 1 or current_col >= self.get_columns():
+        for idx, height in enumerate(self._sections_height):
+            if self._sections_columns[idx] > 1 or current_col >= self._columns:
                 self._sections_col_id[idx] = 0
                 continue
-            if (current_height + section.get_height() > one_column_height and
-                    section.get_height() > one_column_height / 4):  # 让比较小的不单开一列
+            if (current_height + height > one_column_height and
+                    height > one_column_height / 4):  # 让比较小的不单开一列
                 current_col += 1
                 current_height = 0
-            current_height += section.get_height() + self._section_padding
-            self._sections_col_id[idx] = current_col % self.get_columns()
+            current_height += height + self._section_padding
+            self._sections_col_id[idx] = current_col % self._columns
+
+        self._height = self._measure_height()
 
     def get_columns(self):
-        return max([section.get_columns() for section in self.section_bundle])
+        return self._columns
 
     def render(self, img: pixie.Image, x: int, y: int) -> int:
-        column_current_y = [y - self._section_padding for _ in range(self.get_columns())]
+        column_current_y = [y - self._section_padding for _ in range(self._columns)]
         for i, section in enumerate(self.section_bundle):
             idx = self._sections_col_id[i]
+            columns = self._sections_columns[i]
 
             # 保证当前栏不会把跨越的某一栏挡住
-            if section.get_columns() > 1:
+            if columns > 1:
                 current_max_y = max([
-                    column_current_y[idx + j] for j in range(section.get_columns())
+                    column_current_y[idx + j] for j in range(columns)
                 ])
-                for j in range(section.get_columns()):
+                for j in range(columns):
                     column_current_y[idx + j] = current_max_y
 
             current_y = column_current_y[idx] + self._section_padding
@@ -145,26 +155,30 @@ class MultiColumnRenderableSection(RenderableSection):
                 x + (self._content_width + self._column_padding) * idx,
                 current_y
             )
-            for j in range(section.get_columns()):
+            for j in range(columns):
                 column_current_y[idx + j] = current_y
 
         return max(column_current_y)
 
-    def get_height(self):
-        column_current_height = [-self._section_padding for _ in range(self.get_columns())]
+    def _measure_height(self) -> int:
+        column_current_height = [-self._section_padding for _ in range(self._columns)]
 
-        for i, section in enumerate(self.section_bundle):
+        for i, height in enumerate(self._sections_height):
             idx = self._sections_col_id[i]
+            columns = self._sections_columns[i]
 
             # 保证当前栏不会把跨越的某一栏挡住
-            if section.get_columns() > 1:
+            if columns > 1:
                 current_max_height = max([
-                    column_current_height[idx + j] for j in range(section.get_columns())
+                    column_current_height[idx + j] for j in range(columns)
                 ])
-                for j in range(section.get_columns()):
+                for j in range(columns):
                     column_current_height[idx + j] = current_max_height
 
-            for j in range(section.get_columns()):
-                column_current_height[idx + j] += self._section_padding + section.get_height()
+            for j in range(columns):
+                column_current_height[idx + j] += self._section_padding + height
 
         return max(column_current_height)
+
+    def get_height(self):
+        return self._height
@@ -0,0 +1,69 @@
+"""
+分条渲染：先把各分块的绘制调用记录下来，再按水平条带逐条重放
+
+每个条带只分配条带大小的图片，只重放与条带相交的调用，超长榜单的内存占用与条带高度而非榜单长度相关
+"""
+import pixie
+
+
+def _get_translation(transform: pixie.Matrix3) -> tuple[float, float]:
+    return transform.values[6], transform.values[7]
+
+
+class _RecordingContext:
+    """代替 pixie.Context，只支持 easy_pixie.draw_rect 用到的纯色圆角矩形"""
+
+    def __init__(self, canvas: 'RecordingCanvas'):
+        self._canvas = canvas
+        self._rects = []
+        self.fill_style = None
+
+    def rounded_rect(self, x: float, y: float, w: float, h: float, nw: float, ne: float, se: float, sw: float):
+        self._rects.append((x, y, w, h, nw, ne, se, sw))
+
+    def fill(self):
+        paint, rects = self.fill_style, self._rects
+        if paint.kind != pixie.SOLID_PAINT:
+            raise NotImplementedError("分条渲染只支持纯色画笔")
+
+        def _replay(img: pixie.Image, offset: int):
+            ctx = img.new_context()
+            ctx.fill_style = paint
+            for x, y, w, h, nw, ne, se, sw in rects:
+                ctx.rounded_rect(x, y - offset, w, h, nw, ne, se, sw)
+            ctx.fill()
+
+        self._canvas.record(min(rect[1] for rect in rects), max(rect[1] + rect[3] for rect in rects), _replay)
+        self._rects = []
+
+
+class RecordingCanvas:
+    """代替 pixie.Image 传给各分块的 render，记录绘制调用及其纵向范围"""
+
+    def __init__(self, width: int, height: int):
+        self.width, self.height = width, height
+        self._calls = []
+
+    def record(self, top: float, bottom: float, replay):
+        self._calls.append((top, bottom, replay))
+
+    def fill_text(self, font: pixie.Font, text: str, transform: pixie.Matrix3):
+        x, y = _get_translation(transform)
+        # 字形可能略微超出行高，范围取宽松一些，只影响是否重放
+        self.record(y - font.size, y + font.size * 2,
+                    lambda img, offset: img.fill_text(font, text, pixie.translate(x, y - offset)))
+
+    def draw(self, image: pixie.Image, transform: pixie.Matrix3, blend_mode: int = pixie.NORMAL_BLEND):
+        x, y = _get_translation(transform)
+        self.record(y, y + image.height,
+                    lambda img, offset: img.draw(image, pixie.translate(x, y - offset), blend_mode))
+
+    def new_context(self) -> _RecordingContext:
+        return _RecordingContext(self)
+
+    def replay(self, img: pixie.Image, offset: int):
+        """将纵坐标范围 [offset, offset + img.height) 内的调用重放到 img 上"""
+        bottom = offset + img.height
+        for call_top, call_bottom, replay in self._calls:
+            if call_bottom > offset and call_top < bottom:
+                replay(img, offset)
@@ -0,0 +1,98 @@
+"""
+进程内共享的文本排版缓存
+
+easy_pixie 在构造 StyledString、测量宽度与绘制时都会重新断行。这里按 (文本, 字体, 字号, 最大宽度, 行距倍数)
+缓存断行结果与尺寸，相同的文本在进程内只断行、测量一次；接口与 easy_pixie 一致，可直接替换
+
+只缓存断行与宽度，绘制时每行仍由 pixie 的 fill_text 排布字形
+"""
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import easy_pixie
+import pixie
+from easy_pixie import decode_color_object
+
+_LAYOUT_CACHE_SIZE = 4096
+_MAX_WIDTH = 1024  # 与 easy_pixie 中 max_width 为 -1 时的取值一致
+
+
+@dataclass(frozen=True)
+class TextLayout:
+    lines: tuple[tuple[str, int], ...]  # 每段文本及其相对首行的纵向偏移
+    height: int  # 不含 padding_bottom
+    width: float  # 与 easy_pixie.calculate_width 一致，为整段文本不换行时的宽度
+
+
+class _LayoutRecorder:
+    """代替 pixie.Image 传给 easy_pixie.draw_text，记录其断行结果而不实际绘制"""
+
+    def __init__(self):
+        self.lines = []
+
+    def fill_text(self, font: pixie.Font, text: str, transform: pixie.Matrix3):
+        self.lines.append((text, int(transform.values[7])))
+
+
+_layouts: OrderedDict[tuple, TextLayout] = OrderedDict()
+_layouts_lock = threading.Lock()
+
+
+def get_layout(text: 'StyledString') -> TextLayout:
+    """文本的排版结果，超出容量时淘汰最久未使用的"""
+    key = (text.content, text.font.typeface.file_path, text.font.size,
+           text.max_width if text.max_width != -1 else _MAX_WIDTH, text.line_multiplier)
+    with _layouts_lock:
+        layout = _layouts.get(key)
+        if layout is not None:
+            _layouts.move_to_end(key)
+            return layout
+
+    recorder = _LayoutRecorder()
+    padding_bottom, text.padding_bottom = text.padding_bottom, 0
+    try:
+        height = easy_pixie.draw_text(recorder, text, 0, 0)
+    finally:
+        text.padding_bottom = padding_bottom
+    layout = TextLayout(tuple(recorder.lines), height, text.font.layout_bounds(text.content).x)
+
+    with _layouts_lock:
+        _layouts[key] = layout
+        while len(_layouts) > _LAYOUT_CACHE_SIZE:
+            _layouts.popitem(last=False)
+    return layout
+
+
+class StyledString(easy_pixie.StyledString):
+    """与 easy_pixie.StyledString 相同，但构造时的排版经由缓存"""
+
+    def __init__(self, content: str, font_weight: str, font_size: int, **kwargs):
+        self.content = content
+
+        config = {**self._DEFAULTS, **kwargs}
+
+        self.line_multiplier = config["line_multiplier"]
+        self.padding_bottom = config["padding_bottom"]
+        self.max_width = config["max_width"]
+
+        font_path = config["custom_font_path"] or os.path.join(
+            os.path.dirname(easy_pixie.__file__), "data", "font", f'OPPOSans-{font_weight}.ttf'
+        )
+        self._init_font(font_path, font_size, decode_color_object(config["font_color"]))
+        self.height = get_layout(self).height + self.padding_bottom
+
+
+def calculate_width(strings: list[StyledString | None] | StyledString) -> float:
+    if isinstance(strings, easy_pixie.StyledString):
+        strings = [strings]
+    return sum(get_layout(string).width for string in strings if string)
+
+
+def draw_text(image: pixie.Image, text: StyledString, x: int, y: int) -> int:
+    """按缓存的断行结果逐行绘制文本，返回文本基线的高度"""
+    layout = get_layout(text)
+    for line, offset in layout.lines:
+        image.fill_text(text.font, line, pixie.translate(x, y + offset))
+    return y + layout.height + text.padding_bottom
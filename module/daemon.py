@@ -0,0 +1,202 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Callable
+from urllib.parse import urlparse, parse_qs
+
+from module.board.misc import MiscBoardGenerator
+from module.config import Config
+from module.handler import BasicHandler
+from module.history import RANGE_BOARD_DAYS
+from module.utils import search_user_by_uid, fuzzy_search_user, get_date_string
+from module.verdict import ALIAS_MAP
+
+
+def write_file_atomic(path: str, write: Callable[[str], None]):
+    """先由 write 写入临时文件再替换，保证读取方总是拿到完整的图片"""
+    root, ext = os.path.splitext(path)
+    temp_path = f'{root}.{threading.get_ident()}.tmp{ext}'  # pixie 依据扩展名选择编码格式
+    write(temp_path)
+    os.replace(temp_path, path)
+
+
+class BoardService:
+    """
+    常驻进程中的榜单服务
+
+    配置、各榜单的 handler (及其 Session)、已解析的 DailyJson 和渲染资源在多次请求间保持在内存中；
+    同一榜单同一类型的数据在 refresh_ttl 秒内只从 OJ 更新一次，其间的请求直接使用已有数据
+    """
+
+    def __init__(self, configs: list[Config], handlers: dict[str, Callable[[Config], BasicHandler]],
+                 logo_path: str, separate_cols: bool = False, prerendered: bool = False):
+        self.logo_path = logo_path
+        self.separate_cols = separate_cols
+        self.prerendered = prerendered  # 由调度器预渲染，请求时直接返回已有图片
+        self.configs: dict[str, Config] = {}
+        self.handlers: dict[str, BasicHandler] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._refreshed_at: dict[tuple[str, str], float] = {}  # (榜单 id, 类型) -> 上次更新数据的时间
+        self._page_counts: dict[tuple[str, str, str], int] = {}  # (榜单 id, 类型, verdict) -> 上次渲染时的页数
+        for config in configs:
+            handler = handlers.get(config.handler)
+            if not callable(handler):
+                logging.warning(f"榜单 {config.get_config()['id']} 的 handler {config.handler} 暂不支持，已跳过")
+                continue
+            board_id = config.get_config()['id']
+            self.configs[board_id] = config
+            self.handlers[board_id] = handler(config)
+            self._locks[board_id] = threading.Lock()
+
+    def _output_path(self, board_id: str, board_type: str, verdict: str, page: int = 1) -> str:
+        alias = {val: key for key, val in ALIAS_MAP.items()}[verdict]
+        suffix = board_type if verdict == ALIAS_MAP["AC"] else f'{board_type}-{alias}'
+        if page != 1:
+            suffix += f'-p{page}'
+        return os.path.join(self.configs[board_id].work_dir, "data", f'{board_id}-{suffix}.png')
+
+    def _clamp_page(self, board_id: str, board_type: str, verdict: str, page: int) -> int:
+        """今日榜单与未配置 full_board_page_size 时页码恒为 1，已知页数时超出的页码改为最后一页"""
+        if board_type == "now" or not self.configs[board_id].get_config().get("full_board_page_size"):
+            return 1
+        page_count = self._page_counts.get((board_id, board_type, verdict))
+        return page if page_count is None else min(page, page_count)
+
+    def _run(self, board_id: str, func: Callable[[], any]) -> any:
+        """同一榜单的数据更新与渲染串行执行；出错时丢弃内存中的 Session，下次请求重新校验"""
+        with self._locks[board_id]:
+            try:
+                return func()
+            except Exception:
+                self.configs[board_id].set_config("session", None)
+                raise
+
+    def refresh(self, board_id: str, board_type: str):
+        refreshed_at = time.time()
+        self._run(board_id, lambda: self.handlers[board_id].save_daily(board_type))
+        self._refreshed_at[(board_id, board_type)] = refreshed_at
+
+    def _get_fresh_time(self, board_id: str, board_type: str) -> float | None:
+        """数据在 refresh_ttl 秒内更新过时返回更新时间，否则返回 None"""
+        refreshed_at = self._refreshed_at.get((board_id, board_type))
+        if refreshed_at is None:
+            return None
+        if time.time() - refreshed_at >= self.configs[board_id].get_config().get("refresh_ttl", 60):
+            return None
+        return refreshed_at
+
+    def render(self, board_id: str, board_type: str, verdict: str = ALIAS_MAP["AC"], page: int = 1) -> str:
+        """渲染榜单并写入 data 目录，返回图片路径"""
+        def _render():
+            generator = MiscBoardGenerator(self.configs[board_id], board_type, self.logo_path,
+                                           verdict=verdict, separate_columns=self.separate_cols,
+                                           page=self._clamp_page(board_id, board_type, verdict, page))
+            self._page_counts[(board_id, board_type, verdict)] = generator.page_count
+            # 生成器会把超出页数的页码改为最后一页，文件名以实际生成的页码为准
+            output_path = self._output_path(board_id, board_type, verdict, generator.page)
+            write_file_atomic(output_path, generator.render_to_file)
+            return output_path
+
+        return self._run(board_id, _render)
+
+    def generate(self, board_id: str, board_type: str, verdict: str = ALIAS_MAP["AC"], page: int = 1) -> str:
+        self.refresh(board_id, board_type)
+        return self.render(board_id, board_type, verdict, page)
+
+    def cached_output(self, board_id: str, board_type: str, verdict: str = ALIAS_MAP["AC"],
+                      page: int = 1) -> str | None:
+        """返回已渲染的图片路径；昨日及跨天榜单只认今天生成的图片"""
+        output_path = self._output_path(board_id, board_type, verdict, page)
+        if not os.path.exists(output_path):
+            return None
+        if board_type != "now":
+            modified_date = datetime.fromtimestamp(os.stat(output_path).st_mtime).strftime('%Y-%m-%d')
+            if modified_date != get_date_string(False):
+                return None
+        return output_path
+
+    def get_board(self, board_id: str, board_type: str, verdict: str = ALIAS_MAP["AC"], page: int = 1) -> str:
+        page = self._clamp_page(board_id, board_type, verdict, page)
+        if self.prerendered:
+            output_path = self.cached_output(board_id, board_type, verdict, page)
+            if output_path is not None:
+                return output_path
+        refreshed_at = self._get_fresh_time(board_id, board_type)
+        if refreshed_at is None:
+            return self.generate(board_id, board_type, verdict, page)
+        output_path = self.cached_output(board_id, board_type, verdict, page)
+        if output_path is not None and os.stat(output_path).st_mtime >= refreshed_at:
+            return output_path  # 数据更新后已渲染过
+        return self.render(board_id, board_type, verdict, page)
+
+    def query_user(self, board_id: str, uid: str | None = None, name: str | None = None) -> str:
+        handler = self.handlers[board_id]
+        if uid is not None:
+            return self._run(board_id, lambda: search_user_by_uid(uid, handler))
+        return self._run(board_id, lambda: fuzzy_search_user(self.configs[board_id], name, handler))
+
+
+def _make_request_handler(service: BoardService):
+
+    class _RequestHandler(BaseHTTPRequestHandler):
+        """
+        GET /{id}/full[?page=2]          昨日榜单，配置了 full_board_page_size 时可指定完整榜单的页码
+        GET /{id}/weekly | monthly       近七日 / 近三十日榜单，同样可指定页码
+        GET /{id}/now[?verdict=WA]       今日榜单，可指定 verdict 简写
+        GET /{id}/user?uid=|name=        用户查询
+        """
+
+        def log_message(self, format, *args):
+            logging.debug(f"{self.address_string()} {format % args}")
+
+        def _reply(self, code: int, body: bytes, content_type: str):
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _reply_text(self, code: int, text: str):
+            self._reply(code, text.encode("utf-8"), "text/plain; charset=utf-8")
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: val[0] for key, val in parse_qs(url.query).items()}
+            parts = [part for part in url.path.split("/") if part]
+            if len(parts) != 2 or parts[0] not in service.configs:
+                return self._reply_text(HTTPStatus.NOT_FOUND, "未找到对应的榜单")
+            board_id, action = parts
+
+            try:
+                if action in ("full", "now", *RANGE_BOARD_DAYS):
+                    verdict = query.get("verdict", "AC") if action == "now" else "AC"
+                    if verdict not in ALIAS_MAP:
+                        return self._reply_text(HTTPStatus.BAD_REQUEST, f"未知的 verdict {verdict}")
+                    page = query.get("page", "1")
+                    if not page.isdigit() or int(page) < 1:
+                        return self._reply_text(HTTPStatus.BAD_REQUEST, f"无效的页码 {page}")
+                    output_path = service.get_board(board_id, action, ALIAS_MAP[verdict], int(page))
+                    with open(output_path, "rb") as f:
+                        return self._reply(HTTPStatus.OK, f.read(), "image/png")
+                if action == "user" and ("uid" in query or "name" in query):
+                    result = service.query_user(board_id, uid=query.get("uid"), name=query.get("name"))
+                    return self._reply_text(HTTPStatus.OK, result)
+                return self._reply_text(HTTPStatus.NOT_FOUND, "未知的请求")
+            except Exception as e:
+                logging.error(e, exc_info=True)
+                return self._reply_text(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+
+    return _RequestHandler
+
+
+def serve(service: BoardService, host: str, port: int):
+    server = ThreadingHTTPServer((host, port), _make_request_handler(service))
+    logging.info(f"常驻服务已启动，监听 http://{host}:{port}/")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
@@ -0,0 +1,162 @@
+"""
+多日提交记录的历史库
+
+每个榜单一个 SQLite 文件 data/{id}-history.db，昨日数据固定后写入一次，之后按日期 / 用户 / 题目建立索引，
+近七日、近三十日等跨天榜单直接从库中查询，无需逐个解析每天的数据文件
+"""
+import logging
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+from module.config import Config
+from module.structures import DailyJson, SubmissionData, UserData
+from module.utils import read_daily_file
+
+RANGE_BOARD_DAYS = {"weekly": 7, "monthly": 30}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS days (
+    date TEXT PRIMARY KEY,
+    ingested_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS users (
+    uid TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS submissions (
+    date TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    problem_id TEXT NOT NULL,
+    problem_name TEXT NOT NULL,
+    verdict TEXT NOT NULL,
+    score REAL NOT NULL,
+    at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS submissions_date ON submissions (date, at);
+CREATE INDEX IF NOT EXISTS submissions_uid ON submissions (uid, date);
+CREATE INDEX IF NOT EXISTS submissions_problem ON submissions (problem_id, date);
+CREATE INDEX IF NOT EXISTS submissions_verdict ON submissions (verdict, date, uid, problem_id, at);
+"""
+
+
+def get_date_range(days: int, end_date: str | None = None) -> tuple[str, str]:
+    """以 end_date (默认为昨天) 结尾、共 days 天的日期范围，均为 YYYY-MM-DD"""
+    end = (datetime.strptime(end_date, "%Y-%m-%d") if end_date is not None
+           else datetime.now() - timedelta(days=1))
+    return (end - timedelta(days=days - 1)).strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+
+class HistoryStore:
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.path = os.path.join(config.work_dir, "data", f'{config.get_config()["id"]}-history.db')
+        self._conn = sqlite3.connect(self.path)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def has_day(self, date: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM days WHERE date = ?", (date,)).fetchone() is not None
+
+    def ingest(self, date: str, daily: DailyJson, replace: bool = False):
+        """写入一天的提交，已写入的日期默认跳过；replace 为 True 时以新数据覆盖"""
+        with self._conn:
+            if self.has_day(date):
+                if not replace:
+                    return
+                self._conn.execute("DELETE FROM submissions WHERE date = ?", (date,))
+            users = {submission.user.uid: submission.user.name for submission in daily.submissions}
+            self._conn.executemany("INSERT OR REPLACE INTO users (uid, name) VALUES (?, ?)", users.items())
+            self._conn.executemany(
+                "INSERT INTO submissions (date, uid, problem_id, problem_name, verdict, score, at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ((date, submission.user.uid, submission.problem_id, submission.problem_name,
+                  submission.verdict, submission.score, submission.at) for submission in daily.submissions))
+            self._conn.execute("INSERT OR REPLACE INTO days (date, ingested_at) VALUES (?, ?)",
+                               (date, datetime.now().timestamp()))
+        logging.info(f"已将 {date} 的 {len(daily.submissions)} 条提交写入历史库")
+
+    def backfill(self, date_start: str, date_end: str):
+        """将 data 目录中尚未写入历史库的每日数据文件补充写入"""
+        date = datetime.strptime(date_start, "%Y-%m-%d")
+        while date.strftime("%Y-%m-%d") <= date_end:
+            date_string = date.strftime("%Y-%m-%d")
+            date += timedelta(days=1)
+            if self.has_day(date_string):
+                continue
+            for extension in ("pbgs", "json"):
+                file_path = os.path.join(self.config.work_dir, "data",
+                                         f'{self.config.get_config()["id"]}-{date_string}.{extension}')
+                if os.path.exists(file_path):
+                    self.ingest(date_string, read_daily_file(file_path))
+                    break
+
+    def load_submissions(self, date_start: str, date_end: str) -> list[SubmissionData]:
+        """日期范围内 (含两端) 的提交，与 OJ 返回的顺序一致按时间倒序排列，用户名取最近写入的记录"""
+        users: dict[str, UserData] = {}
+        submissions = []
+        rows = self._conn.execute(
+            "SELECT s.uid, u.name, s.score, s.verdict, s.problem_id, s.problem_name, s.at "
+            "FROM submissions s JOIN users u ON s.uid = u.uid "
+            "WHERE s.date BETWEEN ? AND ? ORDER BY s.date DESC, s.rowid", (date_start, date_end))
+        for uid, name, score, verdict, problem_id, problem_name, at in rows:
+            user = users.get(uid)
+            if user is None:
+                user = users[uid] = UserData(name, uid)
+            score = int(score) if score.is_integer() else score
+            submissions.append(SubmissionData(user, score, verdict, problem_id, problem_name, at))
+        return submissions
+
+    def rank_by_verdict(self, date_start: str, date_end: str, verdict: str) -> list[tuple[str, int, int]]:
+        """
+        日期范围内各用户某一 verdict 的 (用户名, 最早提交时间, 次数)，通过的同一题只计一次，
+        顺序与 SubmissionStatistics.rank_by_verdict 一致；只需扫描 submissions_verdict 索引
+        """
+        count = "COUNT(DISTINCT problem_id)" if verdict == "Accepted" else "COUNT(*)"
+        return self._conn.execute(
+            "SELECT u.name, r.earliest, r.cnt FROM ("
+            f"SELECT uid, MIN(at) AS earliest, MAX(at) AS latest, {count} AS cnt FROM submissions "
+            "WHERE verdict = ? AND date BETWEEN ? AND ? GROUP BY uid"
+            ") r JOIN users u ON r.uid = u.uid ORDER BY r.cnt DESC, r.earliest, r.latest DESC",
+            (verdict, date_start, date_end)).fetchall()
+
+    def count_by_time(self, date_start: str, date_end: str,
+                      slot_seconds: int) -> list[tuple[int, str, int, float, int]]:
+        """日期范围内按 slot_seconds 秒对齐的各时间段、各 verdict 的 (起始时刻, verdict, 提交数, 分数之和, 最近提交时间)"""
+        return self._conn.execute(
+            "SELECT at / ? * ? AS slot, verdict, COUNT(*), TOTAL(score), MAX(at) FROM submissions "
+            "WHERE date BETWEEN ? AND ? GROUP BY slot, verdict",
+            (slot_seconds, slot_seconds, date_start, date_end)).fetchall()
+
+    def count_users(self, date_start: str, date_end: str) -> int:
+        return self._conn.execute("SELECT COUNT(DISTINCT uid) FROM submissions WHERE date BETWEEN ? AND ?",
+                                  (date_start, date_end)).fetchone()[0]
+
+    def most_popular_problem(self, date_start: str, date_end: str) -> tuple[str, int]:
+        """日期范围内提交用户数 (按 uid 计) 最多的题目及其用户数，并列时取最近有提交的题目"""
+        row = self._conn.execute(
+            "SELECT problem_name, COUNT(DISTINCT uid) AS cnt FROM submissions WHERE date BETWEEN ? AND ? "
+            "GROUP BY problem_name ORDER BY cnt DESC, MAX(at) DESC LIMIT 1", (date_start, date_end)).fetchone()
+        return (row[0], row[1]) if row is not None else ("", 0)
+
+    def first_accepted(self, date_start: str, date_end: str) -> SubmissionData | None:
+        """日期范围内最早写入的一次通过，与 SubmissionStatistics.get_first_ac 一致"""
+        row = self._conn.execute(
+            "SELECT s.uid, u.name, s.score, s.verdict, s.problem_id, s.problem_name, s.at "
+            "FROM submissions s JOIN users u ON s.uid = u.uid "
+            "WHERE s.date BETWEEN ? AND ? AND s.verdict = 'Accepted' "
+            "ORDER BY s.date, s.rowid DESC LIMIT 1", (date_start, date_end)).fetchone()
+        if row is None:
+            return None
+        uid, name, score, verdict, problem_id, problem_name, at = row
+        score = int(score) if score.is_integer() else score
+        return SubmissionData(UserData(name, uid), score, verdict, problem_id, problem_name, at)
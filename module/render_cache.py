@@ -0,0 +1,80 @@
+"""
+按榜单内容寻址的渲染结果缓存
+
+键为影响图片内容的全部输入的哈希，值为渲染好的 PNG，保存在 data/render_cache/{id}/ 下；
+目录总大小超过 render_cache_size (MB，默认 64，为 0 时关闭缓存) 时按最近使用时间淘汰
+"""
+import hashlib
+import json
+import os
+import threading
+
+import pixie
+
+from module.config import Config
+
+
+def _encode(obj) -> any:
+    # 无法序列化的对象按字符串处理，最坏情况下只会导致缓存不命中
+    return obj.to_json() if hasattr(obj, 'to_json') else str(obj)
+
+
+def hash_inputs(inputs: dict) -> str:
+    content = json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=_encode)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: Config) -> 'RenderCache | None':
+        size = config.get_config().get("render_cache_size", 64)
+        if size <= 0:
+            return None
+        return RenderCache(os.path.join(config.work_dir, "data", "render_cache", config.get_config()["id"]),
+                           int(size * 1024 * 1024))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.png')
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            os.utime(path)  # 以修改时间记录最近使用时间
+        except FileNotFoundError:
+            return None
+        return content
+
+    def put(self, key: str, img: pixie.Image) -> bytes:
+        """写入缓存并返回 PNG 内容"""
+        path = self._path(key)
+        temp_path = os.path.join(self.directory, f'{key}.{threading.get_ident()}.tmp.png')
+        img.write_file(temp_path)
+        with open(temp_path, "rb") as f:
+            content = f.read()
+        os.replace(temp_path, path)
+        self._evict()
+        return content
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".png") and ".tmp." not in entry.name:
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
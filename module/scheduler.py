@@ -0,0 +1,65 @@
+import logging
+import threading
+from datetime import datetime
+
+from module.daemon import BoardService
+from module.verdict import ALIAS_MAP
+
+
+class BoardScheduler:
+    """
+    后台调度器，按各榜单的 refresh_interval 定时更新数据并预渲染今日榜单及全部 verdict 榜单
+
+    昨日榜单在每天 0 点后 full_board_delay 秒生成一次，当天其余时间直接使用缓存
+    """
+
+    def __init__(self, service: BoardService):
+        self.service = service
+        self._stop_event = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self):
+        for board_id in self.service.configs:
+            thread = threading.Thread(target=self._run_board, args=(board_id,),
+                                      name=f'scheduler-{board_id}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logging.info(f"调度器已启动，共 {len(self._threads)} 个榜单")
+
+    def stop(self):
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _seconds_until_full_due(self, board_id: str) -> float:
+        """距离今日昨日榜单应生成的时间，已生成则返回 -1"""
+        if self.service.cached_output(board_id, "full") is not None:
+            return -1
+        config = self.service.configs[board_id].get_config()
+        now = datetime.now()
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return max(0.0, config.get("full_board_delay", 300) - (now - midnight).total_seconds())
+
+    def refresh_board(self, board_id: str):
+        if self._seconds_until_full_due(board_id) == 0:
+            logging.info(f"正在预渲染 {board_id} 的昨日榜单")
+            self.service.generate(board_id, "full")
+
+        logging.info(f"正在预渲染 {board_id} 的今日榜单")
+        self.service.refresh(board_id, "now")
+        for verdict in ALIAS_MAP.values():
+            self.service.render(board_id, "now", verdict)
+
+    def _run_board(self, board_id: str):
+        interval = self.service.configs[board_id].get_config().get("refresh_interval", 300)
+        while not self._stop_event.is_set():
+            try:
+                self.refresh_board(board_id)
+            except Exception as e:
+                logging.error(f"榜单 {board_id} 预渲染失败: {e}", exc_info=True)
+
+            wait_time = interval
+            full_due = self._seconds_until_full_due(board_id)
+            if full_due > 0:  # 避免错过昨日榜单的生成时间
+                wait_time = min(wait_time, full_due)
+            self._stop_event.wait(wait_time)
@@ -0,0 +1,107 @@
+"""
+DailyJson 的紧凑列式存储格式
+
+文件结构: MAGIC + zlib 压缩后的 [4 字节表头长度][表头 json][各列数组]
+表头中保存用户表、题目表、verdict 表、评测记录 id、排行榜以及各列数组的类型与长度；
+提交记录按列存储为 (用户下标, 题目下标, verdict 下标, 分数, 时间戳) 五个定长数组
+"""
+import json
+import struct
+import sys
+import zlib
+from array import array
+
+from module.structures import DailyJson, SubmissionData, UserData, RankingData
+
+MAGIC = b'PBGS\x01'
+
+_COLUMNS = ['user', 'problem', 'verdict', 'score', 'at']
+
+
+def _pick_score_typecode(scores: list) -> str:
+    return 'i' if all(isinstance(score, int) for score in scores) else 'd'
+
+
+def encode_daily(daily: DailyJson) -> bytes:
+    users: dict[str, int] = {}
+    user_table: list[list[str]] = []
+    problems: dict[str, int] = {}
+    problem_table: list[list[str]] = []
+    verdicts: dict[str, int] = {}
+    columns = {key: [] for key in _COLUMNS}
+
+    for submission in daily.submissions:
+        uid = submission.user.uid
+        if uid not in users:
+            users[uid] = len(user_table)
+            user_table.append([uid, submission.user.name])
+        if submission.problem_id not in problems:
+            problems[submission.problem_id] = len(problem_table)
+            problem_table.append([submission.problem_id, submission.problem_name])
+        verdicts.setdefault(submission.verdict, len(verdicts))
+        columns['user'].append(users[uid])
+        columns['problem'].append(problems[submission.problem_id])
+        columns['verdict'].append(verdicts[submission.verdict])
+        columns['score'].append(submission.score)
+        columns['at'].append(submission.at)
+
+    typecodes = {'user': 'I', 'problem': 'I', 'verdict': 'H',
+                 'score': _pick_score_typecode(columns['score']), 'at': 'q'}
+    header = {
+        'users': user_table,
+        'problems': problem_table,
+        'verdicts': list(verdicts),
+        'records': [submission.record_id for submission in daily.submissions],
+        'rankings': {
+            'user_name': [rank.user_name for rank in daily.rankings],
+            'accepted': [rank.accepted for rank in daily.rankings],
+            'uid': [rank.uid for rank in daily.rankings],
+            'rank': [rank.rank for rank in daily.rankings],
+            'unrated': [rank.unrated for rank in daily.rankings],
+        },
+        'count': len(daily.submissions),
+        'typecodes': typecodes,
+        'byteorder': sys.byteorder,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    payload = [struct.pack('<I', len(header_bytes)), header_bytes]
+    for key in _COLUMNS:
+        payload.append(array(typecodes[key], columns[key]).tobytes())
+    return MAGIC + zlib.compress(b''.join(payload))
+
+
+def decode_daily(data: bytes) -> DailyJson:
+    if not data.startswith(MAGIC):
+        raise ValueError("不是有效的榜单快照文件")
+    payload = zlib.decompress(data[len(MAGIC):])
+    header_length = struct.unpack_from('<I', payload)[0]
+    header = json.loads(payload[4:4 + header_length].decode('utf-8'))
+
+    offset, count, columns = 4 + header_length, header['count'], {}
+    for key in _COLUMNS:
+        column = array(header['typecodes'][key])
+        size = column.itemsize * count
+        column.frombytes(payload[offset:offset + size])
+        if header['byteorder'] != sys.byteorder:
+            column.byteswap()
+        columns[key] = column
+        offset += size
+
+    if header['typecodes']['score'] == 'd':  # 混有小数分数时，整数分数仍还原为 int
+        columns['score'] = [int(score) if score.is_integer() else score for score in columns['score']]
+
+    # 同一用户的提交共享同一个 UserData
+    users = [UserData(name, uid) for uid, name in header['users']]
+    problems, verdicts = header['problems'], header['verdicts']
+    records = header.get('records') or [""] * count  # 旧版本的快照中没有评测记录 id
+    submissions = [
+        SubmissionData(users[user], score, verdicts[verdict], problems[problem][0], problems[problem][1], at,
+                       record)
+        for user, problem, verdict, score, at, record in zip(*(columns[key] for key in _COLUMNS), records)
+    ]
+
+    ranking_columns = header['rankings']
+    rankings = [RankingData(*row) for row in zip(ranking_columns['user_name'], ranking_columns['accepted'],
+                                                 ranking_columns['uid'], ranking_columns['rank'],
+                                                 ranking_columns['unrated'])]
+    return DailyJson(submissions, rankings)
@@ -1,4 +1,9 @@
+from collections.abc import Sequence, Iterable, Iterator
+
+
 class UserData:
+    __slots__ = ('name', 'uid', 'status', 'progress', 'mail', 'qq', 'qq_name', 'description')
+
     def __init__(self, name: str, uid: str):
         self.name = name
         self.uid = uid
@@ -9,32 +14,94 @@ class UserData:
         self.qq_name = ""
         self.description = ""
 
+    @classmethod
+    def from_json(cls, json_data: dict):
+        user = UserData(json_data['name'], json_data['uid'])
+        for key in cls.__slots__[2:]:
+            setattr(user, key, json_data.get(key, ""))
+        return user
+
+    def to_json(self) -> dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+
 
 class SubmissionData:
+    __slots__ = ('user', 'score', 'verdict', 'problem_id', 'problem_name', 'at', 'record_id')
 
-    def __init__(self, user: UserData, score: int, verdict: str, problem_id: str, problem_name: str, at: int):
+    def __init__(self, user: UserData, score: int | float, verdict: str, problem_id: str, problem_name: str,
+                 at: int, record_id: str = ""):
         self.user = user
         self.score = score
         self.verdict = verdict
         self.problem_id = problem_id
         self.problem_name = problem_name
-        self.at = at
+        self.at = int(at)
+        self.record_id = record_id  # OJ 中的评测记录 id，旧版本保存的数据中为空
 
     @classmethod
-    def from_json(cls, json_data: dict):
-        return SubmissionData(UserData(json_data['user']['name'], json_data['user']['uid']),
+    def from_json(cls, json_data: dict, users: dict[str, UserData] | None = None):
+        """users 为共享的用户表，同一 uid 的提交复用同一个 UserData"""
+        uid = json_data['user']['uid']
+        if users is None:
+            user = UserData(json_data['user']['name'], uid)
+        else:
+            user = users.get(uid)
+            if user is None:
+                user = users[uid] = UserData(json_data['user']['name'], uid)
+        return SubmissionData(user,
                               json_data['score'], json_data['verdict'],
                               json_data['problem_id'] if 'problem_id' in json_data else "",  # 做个判空兼容一下
-                              json_data['problem_name'], json_data['at'])
+                              json_data['problem_name'], json_data['at'], json_data.get('record_id', ""))
+
+    def to_json(self) -> dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+class SubmissionTable(Sequence):
+    """
+    只读的提交记录表，保持原有顺序
+
+    按 verdict 的筛选会在首次使用时建立索引，之后的查询直接返回索引中的记录，不再遍历全部提交
+    """
+    __slots__ = ('_rows', '_verdict_index')
+
+    def __init__(self, rows: Iterable[SubmissionData] = ()):
+        self._rows: list[SubmissionData] = list(rows)
+        self._verdict_index: dict[str, tuple[SubmissionData, ...]] | None = None
+
+    def __getitem__(self, index):
+        return self._rows[index]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[SubmissionData]:
+        return iter(self._rows)
+
+    def _get_verdict_index(self) -> dict[str, tuple[SubmissionData, ...]]:
+        if self._verdict_index is None:
+            index: dict[str, list[SubmissionData]] = {}
+            for submission in self._rows:
+                index.setdefault(submission.verdict, []).append(submission)
+            self._verdict_index = {verdict: tuple(rows) for verdict, rows in index.items()}
+        return self._verdict_index
+
+    def by_verdict(self, verdict: str) -> tuple[SubmissionData, ...]:
+        """该 verdict 的全部提交，保持原有顺序"""
+        return self._get_verdict_index().get(verdict, ())
+
+    def count_verdict(self, verdict: str) -> int:
+        return len(self.by_verdict(verdict))
 
 
 class RankingData:
+    __slots__ = ('user_name', 'accepted', 'uid', 'rank', 'unrated')
 
-    def __init__(self, user_name: str, accepted: str, uid: str, rank: str, unrated: bool):
+    def __init__(self, user_name: str, accepted: int | str, uid: str, rank: int | str, unrated: bool):
         self.user_name = user_name
-        self.accepted = accepted
+        self.accepted = int(accepted)  # 兼容旧版本以字符串保存的数据
         self.uid = uid
-        self.rank = rank
+        self.rank = int(rank)
         self.unrated = unrated
 
     @classmethod
@@ -42,14 +109,21 @@ class RankingData:
         return RankingData(json_data['user_name'], json_data['accepted'],
                            json_data['uid'], json_data['rank'], json_data['unrated'])
 
+    def to_json(self) -> dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+
 
 class DailyJson:
 
-    def __init__(self, submissions: list[SubmissionData], rankings: list[RankingData]):
-        self.submissions = submissions
+    def __init__(self, submissions: Iterable[SubmissionData], rankings: list[RankingData]):
+        self.submissions = submissions if isinstance(submissions, SubmissionTable) else SubmissionTable(submissions)
         self.rankings = rankings
 
     @classmethod
     def from_json(cls, json_data: dict):
-        return DailyJson([SubmissionData.from_json(item) for item in json_data['submissions']],
+        users: dict[str, UserData] = {}
+        return DailyJson([SubmissionData.from_json(item, users) for item in json_data['submissions']],
                          [RankingData.from_json(item) for item in json_data['rankings']])
+
+    def to_json(self) -> dict:
+        return {'submissions': list(self.submissions), 'rankings': self.rankings}
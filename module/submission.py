@@ -1,5 +1,6 @@
 import logging
 import time
+from collections.abc import Iterable, Sequence
 
 from module.structures import SubmissionData, UserData
 
@@ -32,20 +33,14 @@ def get_hourly_submissions(submission_list: list[SubmissionData]) -> dict:
 
 
 def get_most_popular_problem(submission_list: list[SubmissionData]) -> tuple[str, int]:
-    problem_dict = {}
-    submission_user_dict = {}
+    submission_user_dict: dict[str, set[str]] = {}
     for submission in submission_list:
-        if submission.problem_name not in problem_dict:
-            problem_dict[submission.problem_name] = 0
-            submission_user_dict[submission.problem_name] = []
-        if submission.user.name not in submission_user_dict[submission.problem_name]:
-            problem_dict[submission.problem_name] += 1
-            submission_user_dict[submission.problem_name].append(submission.user.name)
-            logging.debug(f"检测到新提交用户{submission.user.name}，题目{submission.problem_name}，已记录。")
-        else:
-            continue
-    max_problem = max(problem_dict, key=problem_dict.get)
-    return max_problem, problem_dict[max_problem]
+        users = submission_user_dict.setdefault(submission.problem_name, set())
+        if submission.user.name not in users:
+            users.add(submission.user.name)
+            logging.debug("检测到新提交用户%s，题目%s，已记录。", submission.user.name, submission.problem_name)
+    max_problem = max(submission_user_dict, key=lambda problem: len(submission_user_dict[problem]))
+    return max_problem, len(submission_user_dict[max_problem])
 
 
 def classify_by_verdict(submission_list: list[SubmissionData]) -> dict:
@@ -67,7 +62,7 @@ def classify_by_verdict(submission_list: list[SubmissionData]) -> dict:
 
 def rank_by_verdict(submission_list: list[SubmissionData]) -> dict:
     result: dict[str, dict[str, tuple[int, int]]] = {}  # 外层str: verdict, 内层str: user_name
-    problem_ac_list: list[tuple[str, str]] = []  # uid, pid
+    problem_ac_set: set[tuple[str, str]] = set()  # uid, pid
 
     for submission in submission_list:
         if submission.verdict not in result:
@@ -78,9 +73,9 @@ def rank_by_verdict(submission_list: list[SubmissionData]) -> dict:
 
         if submission.verdict != 'Accepted':
             cnt += 1
-        elif (submission.user.uid, submission.problem_id) not in problem_ac_list:
+        elif (submission.user.uid, submission.problem_id) not in problem_ac_set:
             cnt += 1  # 去除同一道题的重复AC (本函数不影响AC率计算，所以直接不算个数即可)
-            problem_ac_list.append((submission.user.uid, submission.problem_id))
+            problem_ac_set.add((submission.user.uid, submission.problem_id))
 
         if submission.at < earliest_submission:
             result[submission.verdict][submission.user.name] = (submission.at, cnt)
@@ -94,4 +89,110 @@ def rank_by_verdict(submission_list: list[SubmissionData]) -> dict:
 
 
 def count_users_submitted(submission_list: list[SubmissionData]) -> int:
-    return len(set([submission.user.name for submission in submission_list]))
+    return len({submission.user.name for submission in submission_list})
+
+
+class SubmissionStatistics:
+    """
+    单次遍历提交列表，同时得到 get_first_ac / get_hourly_submissions / get_most_popular_problem /
+    classify_by_verdict / rank_by_verdict / count_users_submitted 的结果，各方法返回值与同名函数一致
+
+    bucket_minutes 为提交时间分布的区间长度 (需整除一天)，utc_offset 为分布所用时区的 UTC 偏移小时数，
+    留空时使用系统时区
+    """
+
+    def __init__(self, submission_list: Sequence[SubmissionData], bucket_minutes: int = 60,
+                 utc_offset: float | None = None):
+        if bucket_minutes <= 0 or 1440 % bucket_minutes != 0:
+            raise ValueError(f"时间分布区间长度 {bucket_minutes} 分钟无法整除一天")
+        self._total = len(submission_list)
+        self._bucket_seconds = bucket_minutes * 60
+        self._utc_offset = None if utc_offset is None else round(utc_offset * 3600)
+        self._last_ac: SubmissionData | None = None
+        self._hourly = [[0, 0] for _ in range(86400 // self._bucket_seconds)]
+        self._offset_cache: dict[int, int] = {}
+        self._problem_users: dict[str, set[str]] = {}
+        self._verdicts: dict[str, int] = {}
+        self._score_sum = 0
+        self._verdict_rank: dict[str, dict[str, tuple[int, int]]] = {}
+        self._problem_ac: set[tuple[str, str]] = set()
+        self._users: set[str] = set()
+
+        for submission in submission_list:
+            self._feed(submission)
+
+    def _get_utc_offset(self, at: int) -> int:
+        if self._utc_offset is not None:
+            return self._utc_offset
+        # 所有时区偏移均为 15 分钟的整数倍，同一个 15 分钟内的偏移相同
+        key = at // 900
+        offset = self._offset_cache.get(key)
+        if offset is None:
+            offset = self._offset_cache[key] = time.localtime(at).tm_gmtoff
+        return offset
+
+    def _feed(self, submission: SubmissionData):
+        accepted = submission.verdict == 'Accepted'
+        user_name = submission.user.name
+        if accepted:
+            self._last_ac = submission
+
+        hourly = self._hourly[(submission.at + self._get_utc_offset(submission.at)) % 86400
+                              // self._bucket_seconds]
+        if accepted:
+            hourly[0] += 1
+        hourly[1] += 1
+        self._verdicts[submission.verdict] = self._verdicts.get(submission.verdict, 0) + 1
+        self._score_sum += submission.score
+
+        self._problem_users.setdefault(submission.problem_name, set()).add(user_name)
+        self._users.add(user_name)
+
+        verdict_rank = self._verdict_rank.setdefault(submission.verdict, {})
+        earliest_submission, cnt = verdict_rank.get(user_name, (submission.at, 0))
+        if not accepted:
+            cnt += 1
+        elif (submission.user.uid, submission.problem_id) not in self._problem_ac:
+            cnt += 1  # 去除同一道题的重复AC
+            self._problem_ac.add((submission.user.uid, submission.problem_id))
+        verdict_rank[user_name] = (min(earliest_submission, submission.at), cnt)
+
+    def add_time_counts(self, time_counts: Iterable[tuple[int, int, int]]):
+        """
+        计入已按时间段聚合的 (起始时刻, AC 数, 总数)，只影响时间分布；
+        同一时间段内的提交须落在同一区间且时区偏移相同，时间段长度整除 gcd(区间长度, 15 分钟) 即可
+        """
+        for at, accepted, total in time_counts:
+            hourly = self._hourly[(at + self._get_utc_offset(at)) % 86400 // self._bucket_seconds]
+            hourly[0] += accepted
+            hourly[1] += total
+
+    def get_first_ac(self) -> SubmissionData:
+        if self._last_ac is not None:
+            return self._last_ac
+        return get_first_ac([])
+
+    def get_hourly_submissions(self) -> dict:
+        """键为区间序号，默认区间长度为一小时时与 get_hourly_submissions 相同"""
+        # 0: AC 率, 1: 总数
+        return {str(bucket): [0 if total == 0 else ac / total, total]
+                for bucket, (ac, total) in enumerate(self._hourly)}
+
+    def get_most_popular_problem(self) -> tuple[str, int]:
+        max_problem = max(self._problem_users, key=lambda problem: len(self._problem_users[problem]))
+        return max_problem, len(self._problem_users[max_problem])
+
+    def classify_by_verdict(self) -> dict:
+        return {
+            "avg_score": self._score_sum / self._total,
+            "ac_rate": self._verdicts.get('Accepted', 0) / self._total,
+            "verdicts": dict(self._verdicts)
+        }
+
+    def rank_by_verdict(self) -> dict:
+        # 先按照提交次数降序，同次数再按照提交时间升序
+        return {verdict: dict(sorted(verdict_rank.items(), key=lambda x: (-x[1][1], x[1][0])))
+                for verdict, verdict_rank in self._verdict_rank.items()}
+
+    def count_users_submitted(self) -> int:
+        return len(self._users)
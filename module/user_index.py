@@ -0,0 +1,225 @@
+"""
+按用户名查找 uid 的持久化索引，以及用户查询所需的缓存
+
+每个榜单一个 SQLite 文件 data/{id}-users.db，同步今日数据时增量更新，查询时通过内存映射读取。
+查找依次尝试：原始用户名完全匹配 -> 规范化 (NFKC + casefold) 后匹配全名 / 显示名 / 用户名 -> 三元组模糊匹配
+
+同一文件中还保存已解析的用户主页 (带获取时间) 和按 uid 汇总的今日提交统计
+"""
+import difflib
+import json
+import os
+import re
+import sqlite3
+import unicodedata
+
+from module.config import Config
+from module.structures import DailyJson, UserData
+
+# 排行榜中的用户优先于仅出现在今日提交中的用户
+SOURCE_RANKING, SOURCE_SUBMISSION = 0, 1
+
+_FUZZY_CUTOFF = 0.4
+_FUZZY_CANDIDATES = 50
+_FUZZY_POSTINGS = 20000  # 模糊查询最多扫描的三元组倒排记录数，过于常见的三元组不参与筛选候选
+_MMAP_SIZE = 64 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    uid TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    normalized TEXT NOT NULL,
+    source INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS users_name ON users (name);
+CREATE TABLE IF NOT EXISTS aliases (
+    alias TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    PRIMARY KEY (alias, uid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS aliases_uid ON aliases (uid);
+CREATE TABLE IF NOT EXISTS trigrams (
+    gram TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    PRIMARY KEY (gram, uid)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS trigrams_uid ON trigrams (uid);
+CREATE TABLE IF NOT EXISTS gram_counts (
+    gram TEXT PRIMARY KEY,
+    users INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS profiles (
+    uid TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS user_stats (
+    uid TEXT PRIMARY KEY,
+    total INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    accepted INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_DISPLAY_NAME_PATTERN = re.compile(r'^(.*) \((.*)\)$')  # Hydro 中设置了显示名的用户为 "显示名 (用户名)"
+
+
+def normalize_name(name: str) -> str:
+    return unicodedata.normalize('NFKC', name).casefold().strip()
+
+
+def _get_aliases(normalized: str) -> set[str]:
+    aliases = {normalized}
+    match = _DISPLAY_NAME_PATTERN.match(normalized)
+    if match is not None:
+        aliases.update(part.strip() for part in match.groups() if part.strip())
+    return aliases
+
+
+def _get_trigrams(normalized: str) -> set[str]:
+    padded = f'  {normalized} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class UserIndex:
+
+    def __init__(self, config: Config):
+        self.path = os.path.join(config.work_dir, "data", f'{config.get_config()["id"]}-users.db')
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(f"PRAGMA mmap_size = {_MMAP_SIZE}")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def is_empty(self) -> bool:
+        return self._conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is None
+
+    def update(self, daily: DailyJson, date: str | None = None):
+        """
+        根据排行榜与提交记录更新索引，只重建用户名或来源发生变化的用户
+
+        指定 date 时，daily 视为该日的数据，同时重建按 uid 汇总的提交统计
+        """
+        if date is not None:
+            self._update_user_stats(daily, date)
+
+        users: dict[str, tuple[str, int]] = {}
+        for submission in daily.submissions:
+            users.setdefault(submission.user.uid, (submission.user.name, SOURCE_SUBMISSION))
+        for ranking in daily.rankings:
+            users[ranking.uid] = (ranking.user_name, SOURCE_RANKING)
+
+        indexed = {uid: (name, source) for uid, name, source in
+                   self._conn.execute("SELECT uid, name, source FROM users")}
+        changed = [(uid, name, source) for uid, (name, source) in users.items()
+                   if indexed.get(uid) != (name, source)]
+        if len(changed) == 0:
+            return
+
+        with self._conn:
+            replaced = [(uid,) for uid, _, _ in changed if uid in indexed]
+            self._conn.executemany("DELETE FROM aliases WHERE uid = ?", replaced)
+            self._conn.executemany("DELETE FROM trigrams WHERE uid = ?", replaced)
+            normalized = {uid: normalize_name(name) for uid, name, _ in changed}
+            self._conn.executemany("INSERT OR REPLACE INTO users (uid, name, normalized, source) VALUES (?, ?, ?, ?)",
+                                   ((uid, name, normalized[uid], source) for uid, name, source in changed))
+            self._conn.executemany("INSERT INTO aliases (alias, uid) VALUES (?, ?)",
+                                   ((alias, uid) for uid in normalized for alias in _get_aliases(normalized[uid])))
+            self._conn.executemany("INSERT INTO trigrams (gram, uid) VALUES (?, ?)",
+                                   ((gram, uid) for uid in normalized for gram in _get_trigrams(normalized[uid])))
+            self._conn.execute("DELETE FROM gram_counts")
+            self._conn.execute("INSERT INTO gram_counts (gram, users) SELECT gram, COUNT(*) FROM trigrams GROUP BY gram")
+
+    def search(self, name: str) -> str | None:
+        """返回最匹配的 uid，找不到时返回 None"""
+        row = self._conn.execute("SELECT uid FROM users WHERE name = ? ORDER BY source LIMIT 1", (name,)).fetchone()
+        if row is not None:
+            return row[0]
+
+        normalized = normalize_name(name)
+        if len(normalized) == 0:
+            return None
+        row = self._conn.execute("SELECT a.uid FROM aliases a JOIN users u ON a.uid = u.uid "
+                                 "WHERE a.alias = ? ORDER BY u.source LIMIT 1", (normalized,)).fetchone()
+        if row is not None:
+            return row[0]
+
+        # 从最少见的三元组开始选取，以共有三元组最多的用户为候选，再按相似度排序
+        grams, postings = [], 0
+        query_grams = list(_get_trigrams(normalized))
+        for gram, users in self._conn.execute(
+                f"SELECT gram, users FROM gram_counts WHERE gram IN ({', '.join('?' * len(query_grams))}) "
+                f"ORDER BY users", query_grams):
+            if len(grams) > 0 and postings + users > _FUZZY_POSTINGS:
+                break
+            grams.append(gram)
+            postings += users
+        if len(grams) == 0:
+            return None
+        candidates = self._conn.execute(
+            f"SELECT u.uid, u.normalized, u.source FROM "
+            f"(SELECT uid, COUNT(*) AS shared FROM trigrams WHERE gram IN ({', '.join('?' * len(grams))}) "
+            f"GROUP BY uid ORDER BY shared DESC LIMIT {_FUZZY_CANDIDATES}) t JOIN users u ON t.uid = u.uid",
+            grams).fetchall()
+        best, best_key = None, None
+        for uid, candidate, source in candidates:
+            ratio = difflib.SequenceMatcher(None, normalized, candidate).ratio()
+            if ratio < _FUZZY_CUTOFF:
+                continue
+            key = (source, -ratio)
+            if best_key is None or key < best_key:
+                best, best_key = uid, key
+        return best
+
+    def _update_user_stats(self, daily: DailyJson, date: str):
+        stats: dict[str, list] = {}
+        for submission in daily.submissions:
+            user_stats = stats.setdefault(submission.user.uid, [0, 0, 0])
+            user_stats[0] += 1
+            user_stats[1] += submission.score
+            if submission.verdict == "Accepted":
+                user_stats[2] += 1
+        with self._conn:
+            self._conn.execute("DELETE FROM user_stats")
+            self._conn.executemany("INSERT INTO user_stats (uid, total, score_sum, accepted) VALUES (?, ?, ?, ?)",
+                                   ((uid, *user_stats) for uid, user_stats in stats.items()))
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('stats_date', ?)", (date,))
+
+    def get_user_stats(self, uid: str, date: str) -> tuple[int, float, int] | None:
+        """
+        用户在 date 当天的 (提交次数, 分数总和, AC 次数)，没有提交时均为 0
+
+        统计尚未按 date 建立时返回 None
+        """
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'stats_date'").fetchone()
+        if row is None or row[0] != date:
+            return None
+        row = self._conn.execute("SELECT total, score_sum, accepted FROM user_stats WHERE uid = ?", (uid,)).fetchone()
+        return (0, 0, 0) if row is None else row
+
+    def get_profile(self, uid: str) -> tuple[UserData, float] | None:
+        """缓存的用户信息及其获取时间"""
+        row = self._conn.execute("SELECT data, fetched_at FROM profiles WHERE uid = ?", (uid,)).fetchone()
+        if row is None:
+            return None
+        return UserData.from_json(json.loads(row[0])), row[1]
+
+    def save_profile(self, user: UserData, fetched_at: float):
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO profiles (uid, data, fetched_at) VALUES (?, ?, ?)",
+                               (user.uid, json.dumps(user.to_json(), ensure_ascii=False), fetched_at))
+
+    def remove_profile(self, uid: str):
+        with self._conn:
+            self._conn.execute("DELETE FROM profiles WHERE uid = ?", (uid,))
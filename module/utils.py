@@ -1,16 +1,24 @@
-import difflib
+import hashlib
 import json
 import logging
 import os
 import random
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, Future
 from datetime import datetime, timedelta
-from typing import Tuple
+from typing import Tuple, Callable, Iterator, TypeVar
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 from module.config import Config
 from module.handler import BasicHandler
+from module.snapshot import encode_daily, decode_daily
 from module.structures import DailyJson
+from module.user_index import UserIndex
 
 default_headers = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -22,6 +30,12 @@ json_headers = {
     'Accept': 'application/json',
 }
 
+_T = TypeVar('_T')
+
+_daily_json_cache: dict[tuple[str, bool], tuple[str, float, DailyJson]] = {}
+
+_global_random_lock = threading.Lock()
+
 
 def fetch_url(url: str, method: str = 'post', headers: dict | None = None,
               accept_codes: list[int] | None = None,
@@ -53,32 +67,86 @@ def fetch_url(url: str, method: str = 'post', headers: dict | None = None,
     return response
 
 
-def fuzzy_search_user(config: Config, name: str, handler: BasicHandler):
+class _FetchStatistics:
+    """记录经由 Session 发出的每个请求的耗时与下载量，写入性能测试文件"""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self._lock = threading.Lock()
+
+    def __call__(self, response: requests.Response, *args, **kwargs):
+        elapsed = response.elapsed.total_seconds()
+        size = len(response.content)
+        logging.debug(f"{response.request.method} {response.url} 用时 {elapsed:.3f}s，大小 {size} 字节")
+        statistic_file = self.config.get_config().get('statistic_file')
+        if statistic_file is not None and not statistic_file.closed:
+            with self._lock:
+                statistic_file.write(f"[{self.config.get_config()['id']}][fetch] {response.request.method} "
+                                     f"{response.url} 用时 {elapsed:.3f}s，大小 {size} 字节\n")
+
+
+def create_session(config: Config) -> requests.Session:
+    """
+    创建榜单专用的 Session：连接池复用 keep-alive 连接，对 5xx 和超时进行退避重试
+
+    可配置项：http_pool_size (连接池大小)，http_retries (重试次数)，http_backoff (退避系数，单位秒)
+    """
+    retry = Retry(total=config.get_config().get("http_retries", 3),
+                  backoff_factor=config.get_config().get("http_backoff", 0.5),
+                  status_forcelist=[500, 502, 503, 504],
+                  raise_on_status=False)  # 重试耗尽后交给 fetch_url 按 accept_codes 处理
+    pool_size = config.get_config().get("http_pool_size", 10)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.hooks['response'].append(_FetchStatistics(config))
+    return session
+
+
+def iter_pages(fetch_page: Callable[[int], _T], concurrency: int = 1, start: int = 1) -> Iterator[_T]:
+    """
+    按页码顺序产出 fetch_page(page) 的结果，页码从 start 开始无限递增
+
+    concurrency > 1 时会同时保持至多 concurrency 个页面在途，但产出顺序仍与页码顺序一致；
+    调用方停止迭代 (break 后 close 生成器) 时，尚未开始的页面请求会被取消
+    """
+    if concurrency <= 1:
+        page = start
+        while True:
+            yield fetch_page(page)
+            page += 1
+
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    pending: deque[Future] = deque()
+    next_page = start
     try:
-        load_json(config, False)
-    except FileNotFoundError:
-        logging.info("未找到用户排名文件，正在进行更新")
-        handler.save_daily("now")
+        while True:
+            while len(pending) < concurrency:
+                pending.append(executor.submit(fetch_page, next_page))
+                next_page += 1
+            yield pending.popleft().result()
     finally:
-        data = load_json(config, False)
-    
-    # 首先在排行榜中搜索
-    rankings = data.rankings
-    res = difflib.get_close_matches(name, [ranking.user_name for ranking in rankings], cutoff=0.4, n=1)
-    if len(res) > 0:
-        for ranking in rankings:
-            if ranking.user_name == res[0]:
-                return handler.fetch_user(ranking.uid)
-    
-    # 如果在排行榜中未找到，在今日提交中搜索
-    submissions = data.submissions
-    # 创建用户名到 uid 的映射，用于高效查找
-    submission_users_name_to_uid = {submission.user.name: submission.user.uid for submission in submissions}
-    res = difflib.get_close_matches(name, list(submission_users_name_to_uid.keys()), cutoff=0.4, n=1)
-    if len(res) > 0:
-        return handler.fetch_user(submission_users_name_to_uid[res[0]])
-    
-    return "未找到用户"
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def fuzzy_search_user(config: Config, name: str, handler: BasicHandler):
+    with UserIndex(config) as index:
+        if index.is_empty():  # 索引在同步今日数据时建立，这里只处理尚未同步过的情况
+            try:
+                data = load_json(config, False)
+            except FileNotFoundError:
+                logging.info("未找到用户排名文件，正在进行更新")
+                handler.save_daily("now")
+                data = load_json(config, False)
+            index.update(data, get_date_string(False))
+        uid = index.search(name)
+
+    if uid is None:
+        return "未找到用户"
+    return handler.fetch_user(uid)
 
 
 def search_user_by_uid(uid: str, handler: BasicHandler):
@@ -97,19 +165,109 @@ def get_today_timestamp() -> Tuple[int, int]:
     return int(today_start.timestamp()), int(today_end.timestamp())
 
 
-def rand_tips(config: Config):
-    # 构建列表
-    tips_all = []
-    tip_files = [os.path.join(config.work_dir, "data", "tips.json"), os.path.join(config.work_dir, "data", "tips.json")]
-    for file in tip_files:
-        if os.path.exists(file):
-            with open(file, "r", encoding="utf-8") as f:
-                tips = json.load(f)
-                for section in tips:
-                    for tip in section['tips']:
-                        tips_all.append(tip)
-                f.close()
-    return random.choice(tips_all)
+@contextmanager
+def use_random(rng: random.Random):
+    """
+    在上下文中以 rng 的状态替换全局 random，供只使用全局 random 的第三方函数 (如 pick_gradient_color) 复现结果
+
+    退出时将推进后的状态写回 rng，并恢复全局 random 原有的状态
+    """
+    with _global_random_lock:
+        global_state = random.getstate()
+        random.setstate(rng.getstate())
+        try:
+            yield
+        finally:
+            rng.setstate(random.getstate())
+            random.setstate(global_state)
+
+
+def derive_seed(*parts: any) -> int:
+    """由若干字段 (如榜单 id、日期、类型) 导出稳定的随机种子，不受 PYTHONHASHSEED 影响"""
+    content = "|".join(str(part) for part in parts)
+    return int.from_bytes(hashlib.sha256(content.encode('utf-8')).digest()[:8], 'big')
+
+
+class _AliasTable:
+    """Walker 别名表：按权重随机选取，建表 O(n)，每次选取 O(1)"""
+
+    def __init__(self, items: list, weights: list[float]):
+        n = len(items)
+        total = sum(weights)
+        if total <= 0:
+            raise ValueError("没有可供选取的项，或全部权重均为 0")
+        self.items = items
+        self._prob = [weight * n / total for weight in weights]
+        self._alias = list(range(n))
+        small = [i for i in range(n) if self._prob[i] < 1]
+        large = [i for i in range(n) if self._prob[i] >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._alias[less] = more
+            self._prob[more] -= 1 - self._prob[less]
+            (small if self._prob[more] < 1 else large).append(more)
+        for i in small + large:  # 浮点误差导致的剩余项
+            self._prob[i] = 1
+
+    def pick(self, rng) -> any:
+        i = rng.randrange(len(self.items))
+        return self.items[i] if rng.random() < self._prob[i] else self.items[self._alias[i]]
+
+
+_tips_file_cache: dict[str, tuple[float, list[tuple[str, float]]]] = {}
+_tips_table_cache: dict[tuple, _AliasTable] = {}
+
+
+def _load_tips_file(file: str) -> tuple[float, list[tuple[str, float]]]:
+    """解析 tips 文件，返回修改时间与 (tip, 权重) 列表；文件未被改写时直接复用已解析的结果"""
+    modified_time = os.stat(file).st_mtime
+    cached = _tips_file_cache.get(file)
+    if cached is not None and cached[0] == modified_time:
+        return cached
+    with open(file, "r", encoding="utf-8") as f:
+        sections = json.load(f)
+    for section in sections:
+        weight = section.get('weight', 1)
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight < 0:
+            raise ValueError(f"tips 文件 {file} 中分组 {section.get('section')} 的 weight 必须为非负数，当前为 {weight}")
+    tips = [(tip, section.get('weight', 1)) for section in sections for tip in section['tips']]
+    _tips_file_cache[file] = modified_time, tips
+    _tips_table_cache.clear()  # 旧版本文件对应的别名表不会再被使用
+    return modified_time, tips
+
+
+def _get_tip_files(config: Config) -> list[str]:
+    """全局的 data/tips.json，以及配置项 tips_file 指定的榜单专属 tips (相对路径基于项目目录)"""
+    tip_files = [os.path.join(config.work_dir, "data", "tips.json")]
+    board_file = config.get_config().get("tips_file")
+    if board_file is not None:
+        tip_files.append(os.path.join(config.work_dir, board_file))
+    return tip_files
+
+
+def rand_tips(config: Config, rng: random.Random | None = None) -> str:
+    """
+    从全部 tips 来源中按权重随机选取一条
+
+    tips 文件为分组列表，每组可通过 weight 字段 (默认 1) 调整组内每条 tip 被选中的相对概率
+    """
+    cache_key = []
+    for i, file in enumerate(_get_tip_files(config)):
+        if not os.path.exists(file):
+            if i > 0:
+                logging.warning(f"未找到 tips 文件 {file}")
+            continue
+        cache_key.append((file, os.stat(file).st_mtime))
+    cache_key = tuple(cache_key)
+    table = _tips_table_cache.get(cache_key)
+    if table is None:  # 只在 tips 文件变化后重新合并并建表
+        tips_all = [tip for file, _ in cache_key for tip in _load_tips_file(file)[1]]
+        try:
+            table = _AliasTable([tip for tip, _ in tips_all], [weight for _, weight in tips_all])
+        except ValueError as e:
+            raise ValueError(f"无法从 {', '.join(file for file, _ in cache_key)} 中选取 tips: {e}") from e
+        _tips_table_cache[cache_key] = table
+    return table.pick(rng if rng is not None else random)
 
 
 def get_date_string(is_yesterday: bool, split: str = '-') -> str:
@@ -119,21 +277,84 @@ def get_date_string(is_yesterday: bool, split: str = '-') -> str:
     return datetime.fromtimestamp(today_timestamp).strftime(f"%Y{split}%m{split}%d")
 
 
-def load_json(config: Config, is_yesterday: bool) -> DailyJson:
-    json_file = f'{config.get_config()["id"]}-{get_date_string(is_yesterday)}.json'
-    file_path = os.path.join(config.work_dir, "data", json_file)
+def get_daily_path(config: Config, is_yesterday: bool) -> str:
+    """
+    当日数据文件的路径，由配置项 storage 决定存储格式
+
+    json (默认): 与旧版本兼容的 json 文件；columnar: 紧凑的列式快照，见 module/snapshot.py
+    """
+    extension = "pbgs" if config.get_config().get("storage", "json") == "columnar" else "json"
+    daily_file = f'{config.get_config()["id"]}-{get_date_string(is_yesterday)}.{extension}'
+    return os.path.join(config.work_dir, "data", daily_file)
+
+
+def read_daily_file(file_path: str) -> DailyJson:
+    """不经缓存读取数据文件，返回的对象可以安全修改"""
+    if file_path.endswith(".pbgs"):
+        with open(file_path, "rb") as f:
+            return decode_daily(f.read())
     with open(file_path, "r", encoding="utf-8") as f:
         content = json.load(f)
-        f.close()
     return DailyJson.from_json(content)
 
 
+def load_json(config: Config, is_yesterday: bool) -> DailyJson:
+    file_path = get_daily_path(config, is_yesterday)
+
+    # 缓存机制：文件未被改写时直接复用已解析的数据
+    cache_key = (config.get_config()["id"], is_yesterday)
+    modified_time = os.stat(file_path).st_mtime
+    if cache_key in _daily_json_cache:
+        cached_path, cached_time, daily = _daily_json_cache[cache_key]
+        if cached_path == file_path and cached_time == modified_time:
+            return daily
+
+    daily = read_daily_file(file_path)
+    _daily_json_cache[cache_key] = file_path, modified_time, daily
+    return daily
+
+
+def _dump_daily_json(data: DailyJson) -> str:
+    return json.dumps(data, default=lambda o: o.to_json(), ensure_ascii=False, indent=4)
+
+
 def save_json(config: Config, data: DailyJson, is_yesterday: bool = False):
+    file_path = get_daily_path(config, is_yesterday)
+    if file_path.endswith(".pbgs"):
+        with open(file_path, "wb") as f:
+            f.write(encode_daily(data))
+        return
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(_dump_daily_json(data))
+        f.close()
+
+
+def export_json(config: Config, is_yesterday: bool = False) -> str:
+    """将当日数据 (任意存储格式) 导出为旧版 json 文件，返回导出路径"""
     json_file = f'{config.get_config()["id"]}-{get_date_string(is_yesterday)}.json'
     file_path = os.path.join(config.work_dir, "data", json_file)
+    data = read_daily_file(get_daily_path(config, is_yesterday))
     with open(file_path, "w", encoding="utf-8") as f:
-        f.write(json.dumps(data, default=lambda o: o.__dict__, ensure_ascii=False, indent=4))
-        f.close()
+        f.write(_dump_daily_json(data))
+    return file_path
+
+
+def load_sync_state(config: Config) -> dict | None:
+    """读取今日增量同步的高水位记录，不存在或不是今日的记录时返回 None"""
+    file_path = os.path.join(config.work_dir, "data", f'{config.get_config()["id"]}-sync.json')
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    if state.get('date') != get_date_string(False):
+        return None
+    return state
+
+
+def save_sync_state(config: Config, last_at: int):
+    file_path = os.path.join(config.work_dir, "data", f'{config.get_config()["id"]}-sync.json')
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({'date': get_date_string(False), 'last_at': last_at}, indent=4))
 
 
 def performance_test(func):
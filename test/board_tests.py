@@ -0,0 +1,198 @@
+import os
+import random
+import tempfile
+import unittest
+
+import easy_pixie
+import pixie
+from easy_pixie import GradientColor
+
+from module.board.misc import _TileAtlas, _page_rank_data, _count_rank_pages, _slice_rank_data, _split_bands, \
+    _BACKGROUND_TILE_HEIGHT, MiscBoardGenerator
+from module.board.model import RenderableSection, MultiColumnRenderableSection, RenderableSectionBundle
+from module.board.strip import RecordingCanvas
+from module.board.text import StyledString, draw_text, calculate_width, get_layout
+from module.config import Config
+from module.structures import DailyJson, SubmissionData, UserData, RankingData
+from module.utils import save_json, get_today_timestamp
+
+
+def read_png(img: pixie.Image) -> bytes:
+    with tempfile.TemporaryDirectory() as directory:
+        img.write_file(os.path.join(directory, "img.png"))
+        with open(os.path.join(directory, "img.png"), "rb") as f:
+            return f.read()
+
+
+def make_colors(alpha: int) -> GradientColor:
+    return GradientColor([(0, 0, 0, alpha), (0, 0, 0, alpha)], [0.0, 1.0], '')
+
+
+class TestTileAtlas(unittest.TestCase):
+
+    def test_reuse(self):
+        atlas = _TileAtlas(4)
+        tile = atlas.get(360, make_colors(12))
+        self.assertEqual((tile.width, tile.height), (360, 52))
+        self.assertIs(atlas.get(360, make_colors(12)), tile)
+        self.assertIsNot(atlas.get(368, make_colors(12)), tile)
+        self.assertIsNot(atlas.get(360, make_colors(18)), tile)
+
+    def test_evict(self):
+        atlas = _TileAtlas(2)
+        first = atlas.get(360, make_colors(12))
+        second = atlas.get(368, make_colors(12))
+        atlas.get(360, make_colors(12))  # first 最近被使用过，应淘汰 second
+        atlas.get(376, make_colors(12))
+        self.assertIs(atlas.get(360, make_colors(12)), first)
+        self.assertIsNot(atlas.get(368, make_colors(12)), second)
+
+
+class TestTextLayout(unittest.TestCase):
+
+    def test_same_as_easy_pixie(self):
+        content = "这是一条很长的 Tips，需要在最大宽度内换行。\nSecond line with some words"
+        cached = StyledString(content, 'M', 28, line_multiplier=1.32, max_width=300, padding_bottom=16)
+        origin = easy_pixie.StyledString(content, 'M', 28, line_multiplier=1.32, max_width=300, padding_bottom=16)
+        self.assertEqual(cached.height, origin.height)
+        self.assertEqual(calculate_width(cached), easy_pixie.calculate_width(origin))
+
+        cached_img, origin_img = pixie.Image(320, 400), pixie.Image(320, 400)
+        self.assertEqual(draw_text(cached_img, cached, 10, 20), easy_pixie.draw_text(origin_img, origin, 10, 20))
+        self.assertEqual(read_png(cached_img), read_png(origin_img))
+
+    def test_cached(self):
+        first = StyledString("cached", 'B', 36)
+        second = StyledString("cached", 'B', 36, font_color=(0, 0, 0, 100))  # 颜色不影响排版
+        self.assertIs(get_layout(first), get_layout(second))
+        self.assertIsNot(get_layout(first), get_layout(StyledString("cached", 'B', 48)))
+
+
+class TestRankPages(unittest.TestCase):
+
+    def setUp(self):
+        ranks = [1, 2, 2, 4, 5, 5, 5, 5, 9, 10, 11]
+        self.rank = [{'user': f'user{idx}', 'rank': rank, 'Accepted': 20 - rank} for idx, rank in enumerate(ranks)]
+
+    def test_pages(self):
+        self.assertEqual(_count_rank_pages(self.rank, 4), 3)
+        self.assertEqual([row['rank'] for row in _page_rank_data(self.rank, 4, 1)], [1, 2, 2, 4])
+        self.assertEqual([row['rank'] for row in _page_rank_data(self.rank, 4, 2)], [5, 5, 5, 5])
+        self.assertEqual([row['rank'] for row in _page_rank_data(self.rank, 4, 3)], [9, 10, 11])
+
+    def test_same_as_slice(self):
+        for page_size in range(1, 12):
+            self.assertEqual(_page_rank_data(self.rank, page_size, 1), _slice_rank_data(self.rank, page_size))
+            pages = [_page_rank_data(self.rank, page_size, page)
+                     for page in range(1, _count_rank_pages(self.rank, page_size) + 1)]
+            self.assertEqual([row for page in pages for row in page], self.rank)
+
+
+class _CountingSection(RenderableSection):
+
+    def __init__(self, height: int, columns: int = 1):
+        super().__init__(None)
+        self.height, self.columns = height, columns
+        self.measure_count = 0
+
+    def get_columns(self):
+        self.measure_count += 1
+        return self.columns
+
+    def get_height(self):
+        self.measure_count += 1
+        return self.height
+
+    def render(self, img: pixie.Image, x: int, y: int) -> int:
+        return y + self.height
+
+
+class TestSectionLayout(unittest.TestCase):
+
+    def test_measure_once(self):
+        sections = [_CountingSection(height) for height in (300, 200, 100, 400)]
+        bundle = RenderableSectionBundle(None, [_CountingSection(50), _CountingSection(60)], 10)
+        wide = _CountingSection(500, columns=2)
+        multi_column = MultiColumnRenderableSection(None, [*sections, bundle, wide], 100, 10, 10)
+        for _ in range(3):
+            self.assertEqual(multi_column.get_columns(), 2)
+            self.assertEqual(multi_column.get_height(), multi_column.render(pixie.Image(1, 1), 0, 0))
+        for section in [*sections, wide, *bundle.section_bundle]:
+            self.assertEqual(section.measure_count, 2)  # 栏数与高度各一次
+
+
+class TestRecordingCanvas(unittest.TestCase):
+
+    def _draw(self, img: pixie.Image | RecordingCanvas):
+        tile = pixie.Image(40, 30)
+        tile.fill(pixie.Color(0.2, 0.4, 0.6, 1))
+        for idx in range(6):
+            draw_text(img, StyledString(f"row {idx}", 'B', 36), 10, idx * 50)
+            img.draw(tile, pixie.translate(150, idx * 50 + 10))
+
+    def test_replay_strips(self):
+        origin = pixie.Image(200, 300)
+        self._draw(origin)
+
+        canvas = RecordingCanvas(200, 300)
+        self._draw(canvas)
+        stitched = pixie.Image(200, 300)
+        for offset in range(0, 300, 64):
+            strip = pixie.Image(200, min(64, 300 - offset))
+            canvas.replay(strip, offset)
+            stitched.draw(strip, pixie.translate(0, offset))
+        self.assertEqual(read_png(stitched), read_png(origin))
+
+    def test_skip_outside(self):
+        canvas = RecordingCanvas(200, 300)
+        replayed = []
+        canvas.record(0, 50, lambda img, offset: replayed.append("top"))
+        canvas.record(250, 300, lambda img, offset: replayed.append("bottom"))
+        canvas.replay(pixie.Image(200, 100), 0)
+        self.assertEqual(replayed, ["top"])
+
+
+class TestSplitBands(unittest.TestCase):
+
+    def test_cover(self):
+        for total_height, count in [(300, 3), (3 * _BACKGROUND_TILE_HEIGHT + 1, 3),
+                                    (5 * _BACKGROUND_TILE_HEIGHT, 2), (10 * _BACKGROUND_TILE_HEIGHT, 1)]:
+            bands = _split_bands(total_height, count)
+            self.assertLessEqual(len(bands), count)
+            self.assertEqual(bands[0][0], 0)
+            for (offset, height), (next_offset, _) in zip(bands, bands[1:]):
+                self.assertEqual(offset % _BACKGROUND_TILE_HEIGHT, 0)
+                self.assertEqual(offset + height, next_offset)
+            self.assertEqual(bands[-1][0] + bands[-1][1], total_height)
+
+
+class TestParallelRender(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.directory.name, "data"))
+        with open(os.path.join(self.directory.name, "data", "tips.json"), "w", encoding="utf-8") as f:
+            f.write('[{"section": "tips", "tips": ["tip"]}]')
+        self.config = Config(self.directory.name, {"handler": "Hydro", "id": "test", "board_name": "Test OJ",
+                                                   "show_unrated": True})
+        rng = random.Random(0)
+        users = [UserData(f"user{uid}", str(uid)) for uid in range(40)]
+        start = get_today_timestamp()[0]
+        submissions = [SubmissionData(rng.choice(users), 100, rng.choice(["Accepted", "Wrong Answer"]),
+                                      str(idx % 10), f"Problem {idx % 10}", start + 3000 - idx) for idx in range(300)]
+        rankings = [RankingData(user.name, 0, user.uid, idx + 1, False) for idx, user in enumerate(users)]
+        save_json(self.config, DailyJson(submissions, rankings), False)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_same_as_serial(self):
+        generator = MiscBoardGenerator(self.config, "now",
+                                       os.path.join(os.path.dirname(__file__), "..", "data", "logo.png"), seed=1)
+        serial = generator.render()
+        self.assertGreater(serial.height, 2 * _BACKGROUND_TILE_HEIGHT)
+        self.config.set_config("render_workers", 2)
+        self.assertEqual(read_png(generator.render()), read_png(serial))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from module.config import Config
+from module.daemon import BoardService
+from module.handler import BasicHandler
+
+
+class _CountingHandler(BasicHandler):
+
+    def __init__(self, config: Config):
+        super().__init__("CountingHandler")
+        self.refreshed = 0
+
+    def save_daily(self, mode: str):
+        self.refreshed += 1
+
+
+class _PagedGenerator:
+    """代替 MiscBoardGenerator，完整榜单共 3 页，超出的页码改为最后一页"""
+
+    def __init__(self, config: Config, board_type: str, img_path: str, verdict: str,
+                 separate_columns: bool, page: int):
+        self.page_count = 3
+        self.page = min(page, self.page_count)
+
+    def render_to_file(self, path: str):
+        with open(path, "wb") as f:
+            f.write(b"png")
+
+
+class TestBoardService(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.directory.name, "data"))
+        self.config = Config(self.directory.name, {"handler": "Counting", "id": "test", "refresh_ttl": 60})
+        self.service = BoardService([self.config], {"Counting": _CountingHandler}, "logo.png")
+        self.handler = self.service.handlers["test"]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _render(self, board_id: str, board_type: str, verdict: str, page: int = 1) -> str:
+        output_path = self.service._output_path(board_id, board_type, verdict, page)
+        with open(output_path, "wb") as f:
+            f.write(b"png")
+        return output_path
+
+    def test_refresh_once_within_ttl(self):
+        with mock.patch.object(self.service, "render", side_effect=self._render) as render:
+            first = self.service.get_board("test", "now")
+            second = self.service.get_board("test", "now")
+        self.assertEqual(first, second)
+        self.assertEqual(self.handler.refreshed, 1)
+        self.assertEqual(render.call_count, 1)
+
+    def test_refresh_after_ttl(self):
+        with mock.patch.object(self.service, "render", side_effect=self._render):
+            self.service.get_board("test", "now")
+            self.service._refreshed_at[("test", "now")] = time.time() - 61
+            self.service.get_board("test", "now")
+        self.assertEqual(self.handler.refreshed, 2)
+
+
+    def test_clamp_page(self):
+        self.config.set_config("full_board_page_size", 20)
+        with mock.patch("module.daemon.MiscBoardGenerator", _PagedGenerator):
+            paths = {self.service.get_board("test", "full", page=page) for page in (3, 4, 1000)}
+            self.assertEqual(paths, {self.service._output_path("test", "full", "Accepted", 3)})
+            self.assertEqual(self.service._clamp_page("test", "full", "Accepted", 99), 3)
+            self.assertEqual(self.service._clamp_page("test", "now", "Accepted", 2), 1)
+            self.config.set_config("full_board_page_size", None)  # 不分页时忽略页码
+            self.assertEqual(self.service.get_board("test", "full", page=2),
+                             self.service._output_path("test", "full", "Accepted"))
+        self.assertEqual(sorted(os.listdir(os.path.join(self.directory.name, "data"))),
+                         ["test-full-p3.png", "test-full.png"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import random
+import tempfile
+import unittest
+
+from module.board.misc import generate_board_data, generate_range_board_data
+from module.config import Config
+from module.history import HistoryStore, get_date_range
+from module.structures import DailyJson, SubmissionData, UserData
+from module.utils import save_json, get_date_string
+
+
+def make_daily(at: int) -> DailyJson:
+    user_a, user_b = UserData("user2", "2"), UserData("user3", "3")
+    return DailyJson([
+        SubmissionData(user_a, 100, "Accepted", "1001", "A + B", at + 300),
+        SubmissionData(user_b, 37.5, "Wrong Answer", "1002", "A - B", at + 200),
+        SubmissionData(user_a, 100, "Accepted", "1001", "A + B", at + 100),
+        SubmissionData(user_b, 100, "Accepted", "1002", "A - B", at),
+    ], [])
+
+
+class TestHistoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        os.mkdir(os.path.join(self.work_dir.name, "data"))
+        self.config = Config(self.work_dir.name, {'handler': 'Hydro', 'id': 'test'})
+        self.history = HistoryStore(self.config)
+
+    def tearDown(self):
+        self.history.close()
+        self.work_dir.cleanup()
+
+    def test_ingest_once(self):
+        self.history.ingest("2026-01-01", make_daily(1767200000))
+        self.history.ingest("2026-01-01", make_daily(1767200000))
+        self.assertTrue(self.history.has_day("2026-01-01"))
+        self.assertEqual(len(self.history.load_submissions("2026-01-01", "2026-01-01")), 4)
+        self.history.ingest("2026-01-01", DailyJson(make_daily(1767200000).submissions[:1], []), replace=True)
+        self.assertEqual(len(self.history.load_submissions("2026-01-01", "2026-01-01")), 1)
+
+    def test_range(self):
+        self.history.ingest("2026-01-01", make_daily(1767200000))
+        self.history.ingest("2026-01-02", make_daily(1767286400))
+        self.history.ingest("2026-01-03", make_daily(1767372800))
+        submissions = self.history.load_submissions("2026-01-02", "2026-01-03")
+        self.assertEqual([submission.at for submission in submissions],
+                         [1767373100, 1767373000, 1767372900, 1767372800,
+                          1767286700, 1767286600, 1767286500, 1767286400])
+        self.assertEqual(submissions[1].score, 37.5)
+        self.assertIsInstance(submissions[0].score, int)
+        self.assertIs(submissions[0].user, submissions[4].user)
+        # 同一题多日通过只计一次
+        self.assertEqual(self.history.rank_by_verdict("2026-01-01", "2026-01-03", "Accepted"),
+                         [("user3", 1767200000, 1), ("user2", 1767200100, 1)])
+        self.assertEqual(self.history.rank_by_verdict("2026-01-01", "2026-01-03", "Wrong Answer"),
+                         [("user3", 1767200200, 3)])
+
+    def test_range_board_data(self):
+        rng = random.Random(0)
+        users = [UserData(f"user{uid}", str(uid)) for uid in range(30)]
+        verdicts = ["Accepted", "Accepted", "Wrong Answer", "Time Limit Exceeded", "Compile Error"]
+        for day in range(7):
+            at, submissions = 1767200000 + day * 86400 + 86399, []
+            for _ in range(400):
+                problem = rng.randrange(15)
+                submissions.append(SubmissionData(rng.choice(users), rng.choice([0, 37.5, 100]),
+                                                  rng.choice(verdicts), str(problem), f"Problem {problem}", at))
+                at -= rng.randint(1, 200)
+            self.history.ingest(f"2026-01-0{day + 1}", DailyJson(submissions, []))
+
+        submissions = self.history.load_submissions("2026-01-02", "2026-01-06")
+        for verdict in ("Accepted", "Wrong Answer", "Memory Limit Exceeded"):
+            for bucket_minutes, utc_offset in ((60, None), (5, 8), (30, 5.75)):
+                expected = generate_board_data(submissions, verdict, bucket_minutes, utc_offset)
+                actual = generate_range_board_data(self.history, "2026-01-02", "2026-01-06", verdict,
+                                                   bucket_minutes, utc_offset)
+                self.assertEqual(actual.first_ac.at, expected.first_ac.at)
+                actual.first_ac = expected.first_ac
+                self.assertEqual(actual, expected)
+
+    def test_backfill(self):
+        save_json(self.config, make_daily(1767200000), True)
+        yesterday = get_date_string(True)
+        date_start, date_end = get_date_range(7)
+        self.assertEqual(date_end, yesterday)
+        self.history.backfill(date_start, date_end)
+        self.assertTrue(self.history.has_day(yesterday))
+        self.assertEqual(len(self.history.load_submissions(date_start, date_end)), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
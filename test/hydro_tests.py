@@ -50,14 +50,14 @@ class TestSubmissionModule(unittest.TestCase):
     def test_fetch_submissions_yesterday(self):
         result = fetch_submissions(config, True)
         with open("submission_result_yesterday.json", "w", encoding="utf-8") as f:
-            f.write(json.dumps(result, default=lambda o: o.__dict__, ensure_ascii=False, indent=4))
+            f.write(json.dumps(result, default=lambda o: o.to_json(), ensure_ascii=False, indent=4))
             f.close()
         self.assertTrue(len(result) > 0)
 
     def test_fetch_submissions_today(self):
         result = fetch_submissions(config, False)
         with open("submission_result_today.json", "w", encoding="utf-8") as f:
-            f.write(json.dumps(result, default=lambda o: o.__dict__, ensure_ascii=False, indent=4))
+            f.write(json.dumps(result, default=lambda o: o.to_json(), ensure_ascii=False, indent=4))
             f.close()
         self.assertTrue(len(result) > 0)
 
@@ -65,7 +65,7 @@ class TestSubmissionModule(unittest.TestCase):
         yesterday_submissions, today_submissions = load_submission_json()
         result = {"yesterday": get_first_ac(yesterday_submissions), "today": get_first_ac(today_submissions)}
         with open("first_ac.json", "w", encoding="utf-8") as f:
-            f.write(json.dumps(result, default=lambda o: o.__dict__, ensure_ascii=False, indent=4))
+            f.write(json.dumps(result, default=lambda o: o.to_json(), ensure_ascii=False, indent=4))
             f.close()
         self.assertTrue(len(result) > 0)
 
@@ -74,7 +74,7 @@ class TestSubmissionModule(unittest.TestCase):
         result = {"yesterday": get_hourly_submissions(yesterday_submissions),
                   "today": get_hourly_submissions(today_submissions)}
         with open("hourly_ac.json", "w", encoding="utf-8") as f:
-            f.write(json.dumps(result, default=lambda o: o.__dict__, ensure_ascii=False, indent=4))
+            f.write(json.dumps(result, default=lambda o: o.to_json(), ensure_ascii=False, indent=4))
             f.close()
         self.assertTrue(len(result) > 0)
 
@@ -83,7 +83,7 @@ class TestSubmissionModule(unittest.TestCase):
         result = {"yesterday": get_most_popular_problem(yesterday_submissions),
                   "today": get_most_popular_problem(today_submissions)}
         with open("popular_problem.json", "w", encoding="utf-8") as f:
-            f.write(json.dumps(result, default=lambda o: o.__dict__, ensure_ascii=False, indent=4))
+            f.write(json.dumps(result, default=lambda o: o.to_json(), ensure_ascii=False, indent=4))
             f.close()
         self.assertTrue(len(result) > 0)
 
@@ -92,7 +92,7 @@ class TestSubmissionModule(unittest.TestCase):
         result = {"yesterday": classify_by_verdict(yesterday_submissions),
                   "today": classify_by_verdict(today_submissions)}
         with open("classify_by_verdict.json", "w", encoding="utf-8") as f:
-            f.write(json.dumps(result, default=lambda o: o.__dict__, ensure_ascii=False, indent=4))
+            f.write(json.dumps(result, default=lambda o: o.to_json(), ensure_ascii=False, indent=4))
             f.close()
         self.assertTrue(len(result) > 0)
 
@@ -101,7 +101,7 @@ class TestSubmissionModule(unittest.TestCase):
         result = {"yesterday": rank_by_verdict(yesterday_submissions),
                   "today": rank_by_verdict(today_submissions)}
         with open("rank_by_verdict.json", "w", encoding="utf-8") as f:
-            f.write(json.dumps(result, default=lambda o: o.__dict__, ensure_ascii=False, indent=4))
+            f.write(json.dumps(result, default=lambda o: o.to_json(), ensure_ascii=False, indent=4))
             f.close()
         self.assertTrue(len(result) > 0)
 
@@ -111,7 +111,7 @@ class TestUserModule(unittest.TestCase):
         uid = config.get_config()["test"]['user']['uid']
         result = fetch_user(config, uid)
         with open("user.json", "w", encoding="utf-8") as f:
-            f.write(json.dumps(result, default=lambda o: o.__dict__, ensure_ascii=False, indent=4))
+            f.write(json.dumps(result, default=lambda o: o.to_json(), ensure_ascii=False, indent=4))
             f.close()
         # 在测试 json 中填入一个有 qq 号的用户来检验 infer_qq 模块是否正常
         self.assertTrue(result.qq != "")
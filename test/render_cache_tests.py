@@ -0,0 +1,54 @@
+import os
+import tempfile
+import time
+import unittest
+
+import pixie
+
+from module.render_cache import RenderCache, hash_inputs
+from module.structures import UserData
+
+
+def make_image(width: int) -> pixie.Image:
+    img = pixie.Image(width, 16)
+    img.fill(pixie.Color(0.2, 0.4, 0.6, 1))
+    return img
+
+
+class TestRenderCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_hash_inputs(self):
+        self.assertEqual(hash_inputs({'a': 1, 'b': UserData("user2", "2")}),
+                         hash_inputs({'b': UserData("user2", "2"), 'a': 1}))
+        self.assertNotEqual(hash_inputs({'a': 1}), hash_inputs({'a': 2}))
+
+    def test_get_put(self):
+        cache = RenderCache(self.directory.name, 1024 * 1024)
+        self.assertIsNone(cache.get("key"))
+        content = cache.put("key", make_image(16))
+        self.assertTrue(content.startswith(b'\x89PNG'))
+        self.assertEqual(cache.get("key"), content)
+
+    def test_evict(self):
+        size = len(RenderCache(self.directory.name, 1024 * 1024).put("probe", make_image(64)))
+        os.remove(os.path.join(self.directory.name, "probe.png"))
+        cache = RenderCache(self.directory.name, size * 2)
+        cache.put("first", make_image(64))
+        cache.put("second", make_image(64))
+        past = time.time() - 60
+        os.utime(os.path.join(self.directory.name, "second.png"), (past, past))
+        cache.get("first")  # first 最近被使用过，应淘汰 second
+        cache.put("third", make_image(64))
+        self.assertIsNotNone(cache.get("first"))
+        self.assertIsNone(cache.get("second"))
+        self.assertIsNotNone(cache.get("third"))
+
+
+if __name__ == '__main__':
+    unittest.main()
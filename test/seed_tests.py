@@ -0,0 +1,38 @@
+import os
+import random
+import unittest
+
+from easy_pixie import pick_gradient_color
+
+from module.config import Config
+from module.utils import use_random, derive_seed, rand_tips
+
+config = Config(os.path.join(os.path.dirname(__file__), ".."), {"handler": "Hydro", "id": "test"})
+
+
+class TestSeed(unittest.TestCase):
+
+    def test_derive_seed(self):
+        self.assertEqual(derive_seed("test", "2024-01-01", "now"), derive_seed("test", "2024-01-01", "now"))
+        self.assertNotEqual(derive_seed("test", "2024-01-01", "now"), derive_seed("test", "2024-01-02", "now"))
+
+    def test_use_random(self):
+        picked = []
+        for _ in range(2):
+            rng = random.Random(42)
+            with use_random(rng):
+                gradient_color = pick_gradient_color()
+            picked.append((gradient_color.name, gradient_color.color_list, rand_tips(config, rng)))
+        self.assertEqual(picked[0], picked[1])
+
+    def test_global_state_restored(self):
+        random.seed(1)
+        expected = random.random()
+        random.seed(1)
+        with use_random(random.Random(42)):
+            random.random()
+        self.assertEqual(random.random(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
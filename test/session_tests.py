@@ -0,0 +1,38 @@
+import os
+import stat
+import tempfile
+import unittest
+
+import requests
+
+from module.Hydro.entry import HydroHandler
+from module.config import Config
+
+
+class TestSessionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.directory.name, "data"))
+        self.config = Config(self.directory.name, {"handler": "Hydro", "id": "test", "url": "http://oj/"})
+        self.handler = HydroHandler(self.config)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    @unittest.skipUnless(os.name == "posix", "文件权限仅在 POSIX 系统上检查")
+    def test_private_file(self):
+        session = requests.Session()
+        session.cookies.set("sid", "secret", domain="oj", path="/")
+        self.handler.save_session(session)
+        self.assertEqual(stat.S_IMODE(os.stat(self.handler._session_file()).st_mode), 0o600)
+
+    def test_corrupt_file(self):
+        for content in ('{"expires": ', '{}', '[]'):
+            with open(self.handler._session_file(), "w", encoding="utf-8") as f:
+                f.write(content)
+            self.assertIsNone(self.handler.restore_session())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+import unittest
+
+from module.config import Config
+from module.snapshot import encode_daily, decode_daily
+from module.structures import DailyJson, SubmissionData, UserData, RankingData
+from module.utils import save_json, export_json, read_daily_file, get_daily_path
+
+
+def make_daily_json() -> DailyJson:
+    submissions = [
+        SubmissionData(UserData("显示名 (user2)", "2"), 100, "Accepted", "1001", "A + B", 1700000300,
+                       "65f000000000000000000003"),
+        SubmissionData(UserData("user3", "3"), 0, "Wrong Answer", "1002", "A - B", 1700000200,
+                       "65f000000000000000000002"),
+        SubmissionData(UserData("显示名 (user2)", "2"), 37.5, "Time Limit Exceeded", "1002", "A - B", 1700000100),
+    ]
+    rankings = [RankingData("显示名 (user2)", "12", "2", "1", False),
+                RankingData("user3", "7", "3", "2", True)]
+    return DailyJson(submissions, rankings)
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def test_round_trip(self):
+        daily = make_daily_json()
+        decoded = decode_daily(encode_daily(daily))
+        self.assertEqual(json.dumps(daily, default=lambda o: o.to_json()),
+                         json.dumps(decoded, default=lambda o: o.to_json()))
+
+    def test_shared_user(self):
+        decoded = decode_daily(encode_daily(make_daily_json()))
+        self.assertIs(decoded.submissions[0].user, decoded.submissions[2].user)
+
+    def test_empty(self):
+        decoded = decode_daily(encode_daily(DailyJson([], [])))
+        self.assertEqual(len(decoded.submissions), 0)
+        self.assertEqual(len(decoded.rankings), 0)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            decode_daily(b'{"submissions": []}')
+
+    def test_export_json(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            os.makedirs(os.path.join(work_dir, "data"))
+            config = Config(work_dir, {"handler": "Hydro", "id": "test", "storage": "columnar"})
+            daily = make_daily_json()
+            save_json(config, daily, False)
+            self.assertTrue(get_daily_path(config, False).endswith(".pbgs"))
+            exported = export_json(config, False)
+            self.assertTrue(exported.endswith(".json"))
+            self.assertEqual(json.dumps(read_daily_file(exported), default=lambda o: o.to_json()),
+                             json.dumps(daily, default=lambda o: o.to_json()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import gc
+import os
+import random
+import tempfile
+import time
+import unittest
+
+from module.Hydro.entry import HydroHandler
+from module.board.misc import generate_board_data
+from module.config import Config
+from module.structures import SubmissionData, UserData, DailyJson, RankingData
+from module.utils import save_json
+from module.submission import SubmissionStatistics, get_first_ac, get_hourly_submissions, \
+    get_most_popular_problem, classify_by_verdict, rank_by_verdict, count_users_submitted
+
+_VERDICTS = ["Accepted"] * 4 + ["Wrong Answer"] * 3 + \
+            ["Time Limit Exceeded", "Compile Error", "Runtime Error", "Memory Limit Exceeded"]
+
+
+def make_submissions(count: int, user_count: int, problem_count: int, seed: int = 0) -> list[SubmissionData]:
+    """按时间倒序生成一天内的随机提交，与 OJ 返回的顺序一致"""
+    rng = random.Random(seed)
+    users = [UserData(f"user{uid}", str(uid)) for uid in range(user_count)]
+    at, submissions = 1700000000 + 86399, []
+    for _ in range(count):
+        problem = rng.randrange(problem_count)
+        submissions.append(SubmissionData(rng.choice(users), rng.choice([0, 30, 100]), rng.choice(_VERDICTS),
+                                          str(problem), f"Problem {problem}", at))
+        at -= rng.randint(0, 1)
+    return submissions
+
+
+def _submission_key(submission: SubmissionData) -> tuple:
+    return submission.user.uid, submission.user.name, submission.problem_id, submission.verdict, submission.at
+
+
+def legacy_statistics(submissions: list[SubmissionData]) -> tuple:
+    return (_submission_key(get_first_ac(submissions)), get_hourly_submissions(submissions),
+            get_most_popular_problem(submissions), classify_by_verdict(submissions),
+            rank_by_verdict(submissions), count_users_submitted(submissions))
+
+
+def single_pass_statistics(submissions: list[SubmissionData]) -> tuple:
+    statistics = SubmissionStatistics(submissions)
+    return (_submission_key(statistics.get_first_ac()), statistics.get_hourly_submissions(),
+            statistics.get_most_popular_problem(), statistics.classify_by_verdict(),
+            statistics.rank_by_verdict(), statistics.count_users_submitted())
+
+
+class TestSubmissionStatistics(unittest.TestCase):
+
+    def test_identical(self):
+        for seed in range(3):
+            submissions = make_submissions(5000, 200, 60, seed)
+            self.assertEqual(legacy_statistics(submissions), single_pass_statistics(submissions))
+
+    def test_rank_order(self):
+        # 并列时的顺序同样需要一致
+        for submissions in (make_submissions(2000, 5, 3, 1), make_submissions(300, 300, 1, 2)):
+            legacy, single_pass = rank_by_verdict(submissions), SubmissionStatistics(submissions).rank_by_verdict()
+            for verdict in legacy:
+                self.assertEqual(list(legacy[verdict].items()), list(single_pass[verdict].items()))
+
+    def test_no_accepted(self):
+        submissions = [submission for submission in make_submissions(500, 20, 10)
+                       if submission.verdict != "Accepted"]
+        self.assertEqual(legacy_statistics(submissions), single_pass_statistics(submissions))
+        board = generate_board_data(submissions, "Accepted")
+        self.assertEqual(board.total_board, [])
+        self.assertEqual(board.first_ac.user.uid, "-1")
+
+    def test_bucket(self):
+        submissions = make_submissions(3000, 50, 20)
+        hourly = SubmissionStatistics(submissions, bucket_minutes=15, utc_offset=8).get_hourly_submissions()
+        self.assertEqual(len(hourly), 96)
+        expected = [0] * 96
+        for submission in submissions:
+            expected[(submission.at + 8 * 3600) % 86400 // 900] += 1
+        self.assertEqual([hourly[str(bucket)][1] for bucket in range(96)], expected)
+        with self.assertRaises(ValueError):
+            SubmissionStatistics(submissions, bucket_minutes=7)
+
+
+@unittest.skipUnless(os.environ.get('PBG_BENCHMARK'), "设置 PBG_BENCHMARK=1 以运行性能测试")
+class BenchmarkSubmissionStatistics(unittest.TestCase):
+
+    def test_benchmark(self):
+        # 用户与题目较少，避免旧实现中的线性查找拖慢基准
+        submissions = make_submissions(120000, 60, 20)
+        start = time.perf_counter()
+        legacy = legacy_statistics(submissions)
+        legacy_time = time.perf_counter() - start
+        start = time.perf_counter()
+        single_pass = single_pass_statistics(submissions)
+        single_pass_time = time.perf_counter() - start
+        print(f"\n{len(submissions)} 条提交: 逐项统计 {legacy_time:.3f}s, 单次遍历 {single_pass_time:.3f}s")
+        self.assertEqual(legacy, single_pass)
+        self.assertLess(single_pass_time, legacy_time)
+
+
+def _measure(func, *args, repeat: int = 7) -> float:
+    """取多次运行中最短的耗时，与 timeit 一样计时时关闭垃圾回收，减小计时噪声的影响"""
+    best = float('inf')
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(*args)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best
+
+
+@unittest.skipUnless(os.environ.get('PBG_BENCHMARK'), "设置 PBG_BENCHMARK=1 以运行性能测试")
+class BenchmarkLinearScaling(unittest.TestCase):
+    """数据量扩大 4 倍时耗时不应超过 12 倍 (平方复杂度约为 16 倍)"""
+
+    def assertLinear(self, name: str, small: float, large: float):
+        print(f"\n{name}: {small:.3f}s -> {large:.3f}s (x{large / small:.1f})")
+        self.assertLess(large / small, 12)
+
+    def test_statistics(self):
+        # 用户与题目数量随提交数同步增长，同一 (用户, 题目) 组合的数量也随之线性增长
+        small, large = make_submissions(25000, 1000, 200), make_submissions(100000, 4000, 800)
+        for func in (rank_by_verdict, get_most_popular_problem, generate_board_data):
+            args = () if func is not generate_board_data else ("Accepted",)
+            self.assertLinear(func.__name__, _measure(func, small, *args), _measure(func, large, *args))
+
+    def test_calculate_ranking(self):
+        def run(count: int, user_count: int) -> float:
+            with tempfile.TemporaryDirectory() as work_dir:
+                os.mkdir(os.path.join(work_dir, "data"))
+                config = Config(work_dir, {'handler': 'Hydro', 'url': 'http://127.0.0.1', 'id': 'bench',
+                                           'exclude_uid': []})
+                rankings = [RankingData(f"user{uid}", 0, str(uid), uid + 1, False) for uid in range(user_count)]
+                save_json(config, DailyJson([], rankings), True)
+                submissions = make_submissions(count, user_count, user_count // 5)
+                for submission in submissions:
+                    submission.at = 2 ** 40  # 晚于昨日文件的修改时间
+                return _measure(HydroHandler(config).calculate_ranking, submissions)
+
+        self.assertLinear("calculate_ranking", run(25000, 1000), run(100000, 4000))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import json
+import unittest
+
+from module.structures import DailyJson, SubmissionData, SubmissionTable, UserData, RankingData
+
+
+def make_submissions() -> list[SubmissionData]:
+    user_a, user_b = UserData("user2", "2"), UserData("user3", "3")
+    return [
+        SubmissionData(user_a, 100, "Accepted", "1001", "A + B", 1700000400),
+        SubmissionData(user_b, 0, "Wrong Answer", "1002", "A - B", 1700000300),
+        SubmissionData(user_a, 100, "Accepted", "1002", "A - B", 1700000200),
+        SubmissionData(user_b, 0, "Compile Error", "1001", "A + B", 1700000100),
+    ]
+
+
+class TestSubmissionTable(unittest.TestCase):
+
+    def test_sequence(self):
+        submissions = make_submissions()
+        table = SubmissionTable(submissions)
+        self.assertEqual(len(table), 4)
+        self.assertEqual(list(table), submissions)
+        self.assertEqual(table[::-1], submissions[::-1])
+
+    def test_by_verdict(self):
+        submissions = make_submissions()
+        table = SubmissionTable(submissions)
+        self.assertEqual(list(table.by_verdict("Accepted")), [submissions[0], submissions[2]])
+        self.assertIs(table.by_verdict("Accepted"), table.by_verdict("Accepted"))
+        self.assertEqual(table.count_verdict("Accepted"), 2)
+        self.assertEqual(len(table.by_verdict("Time Limit Exceeded")), 0)
+
+
+class TestDailyJson(unittest.TestCase):
+
+    def test_legacy_json(self):
+        # 旧版本保存的数据中 accepted / rank 为字符串
+        content = {
+            'submissions': [submission.to_json() for submission in make_submissions()],
+            'rankings': [{'user_name': "user2", 'accepted': "12", 'uid': "2", 'rank': "1", 'unrated': False}]
+        }
+        daily = DailyJson.from_json(json.loads(json.dumps(content, default=lambda o: o.to_json())))
+        self.assertEqual(daily.rankings[0].accepted, 12)
+        self.assertEqual(daily.rankings[0].rank, 1)
+        self.assertIs(daily.submissions[0].user, daily.submissions[2].user)
+
+    def test_ranking_sort(self):
+        rankings = [RankingData("a", "9", "2", "1", False), RankingData("b", "10", "3", "2", False)]
+        self.assertEqual(max(rankings, key=lambda x: x.accepted).user_name, "b")
+
+
+if __name__ == '__main__':
+    unittest.main()
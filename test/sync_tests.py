@@ -0,0 +1,100 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from module.Hydro.entry import HydroHandler
+from module.config import Config
+from module.structures import DailyJson, SubmissionData, UserData
+from module.utils import save_json, save_sync_state, load_sync_state, get_today_timestamp
+
+user = UserData("user1", "1")
+
+
+def make_submission(record_id: str, at: int, verdict: str = "Accepted") -> SubmissionData:
+    return SubmissionData(user, 100, verdict, "1001", "A + B", at, record_id)
+
+
+class TestSyncToday(unittest.TestCase):
+    """OJ 中的记录按评测记录 id 倒序排列，获取在第一条评测时间早于 since 的记录处停止，与 fetch_submissions 一致"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.directory.name, "data"))
+        self.config = Config(self.directory.name, {"handler": "Hydro", "id": "test", "url": "http://oj/",
+                                                   "sync_window": 600, "exclude_uid": []})
+        self.handler = HydroHandler(self.config)
+        self.start = get_today_timestamp()[0]
+        self.records: list[SubmissionData] = []
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _fetch(self, config: Config, is_yesterday: bool, since: int | None = None) -> list[SubmissionData]:
+        result = []
+        for record in sorted(self.records, key=lambda record: int(record.record_id), reverse=True):
+            if since is not None and record.at < since:
+                break
+            result.append(record)
+        return result
+
+    def _sync(self) -> list[SubmissionData]:
+        with mock.patch("module.Hydro.entry.fetch_submissions", side_effect=self._fetch):
+            return self.handler.sync_today()
+
+    def _cache(self, submissions: list[SubmissionData], last_at: int):
+        save_json(self.config, DailyJson(submissions, []), False)
+        save_sync_state(self.config, last_at)
+
+    def test_full_sync_without_state(self):
+        self.records = [make_submission("1", self.start + 10), make_submission("2", self.start + 20)]
+        submissions = self._sync()
+        self.assertEqual([s.record_id for s in submissions], ["2", "1"])
+        self.assertEqual(load_sync_state(self.config)['last_at'], self.start + 20)
+
+    def test_window_overlap(self):
+        self.records = [make_submission("1", self.start + 100), make_submission("2", self.start + 1300),
+                        make_submission("3", self.start + 2000, "Wrong Answer")]
+        self._cache(self._fetch(self.config, False), self.start + 2000)
+        self.records[2] = make_submission("3", self.start + 2000)
+        self.records.append(make_submission("4", self.start + 2100))
+        submissions = self._sync()
+        self.assertEqual([s.record_id for s in submissions], ["4", "3", "2", "1"])
+        self.assertEqual(submissions[1].verdict, "Accepted")  # 窗口内以新获取的为准
+        self.assertEqual(load_sync_state(self.config)['last_at'], self.start + 2100)
+
+    def test_keep_cached_below_stop(self):
+        # 记录 100 的评测时间早于 since，获取在此停止，id 更小但评测时间在窗口内的记录 99 不会被重新获取
+        self.records = [make_submission("99", self.start + 1000), make_submission("100", self.start + 995)]
+        self._cache([self.records[0], self.records[1]], self.start + 1598)
+        submissions = self._sync()
+        self.assertEqual([s.record_id for s in submissions], ["99", "100"])
+
+    def test_rejudge(self):
+        self.records = [make_submission("1", self.start + 100, "Wrong Answer"), make_submission("2", self.start + 2000)]
+        self._cache([self.records[1], self.records[0]], self.start + 2000)
+        self.records[0] = make_submission("1", self.start + 2500)  # 重测后评测时间变化
+        self.records.append(make_submission("3", self.start + 2400))
+        submissions = self._sync()
+        self.assertEqual([s.record_id for s in submissions], ["1", "3", "2"])
+        self.assertEqual(submissions[0].verdict, "Accepted")
+
+    def test_legacy_without_id(self):
+        self._cache([make_submission("", self.start + 1900, "Wrong Answer"),
+                     make_submission("", self.start + 100)], self.start + 1900)
+        self.records = [make_submission("5", self.start + 1900)]
+        submissions = self._sync()
+        self.assertEqual([s.record_id for s in submissions], ["5", ""])
+
+    def test_range_board_skips_today(self):
+        save_json(self.config, DailyJson([make_submission("1", self.start - 100)], []), True)  # 昨日数据已固定
+        with mock.patch.object(HydroHandler, "begin_session"), \
+                mock.patch("module.Hydro.entry.fetch_submissions", side_effect=self._fetch) as fetch:
+            self.handler.save_daily("weekly")
+            fetch.assert_not_called()
+            self.handler.save_daily("now")
+            fetch.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from collections import Counter
+
+from module.config import Config
+from module.utils import rand_tips
+
+
+def write_tips(path: str, sections: list[dict], modified_time: float):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(sections, f, ensure_ascii=False)
+    os.utime(path, (modified_time, modified_time))
+
+
+class TestRandTips(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        os.makedirs(os.path.join(self.directory.name, "data"))
+        self.global_file = os.path.join(self.directory.name, "data", "tips.json")
+        write_tips(self.global_file, [{"section": "tips", "tips": ["a", "b"]}], 1000)
+        self.config = Config(self.directory.name, {"handler": "Hydro", "id": "test"})
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_uniform(self):
+        rng = random.Random(1)
+        counter = Counter(rand_tips(self.config, rng) for _ in range(4000))
+        self.assertEqual(set(counter), {"a", "b"})
+        self.assertAlmostEqual(counter["a"] / 4000, 0.5, delta=0.05)
+
+    def test_weighted_board_tips(self):
+        write_tips(os.path.join(self.directory.name, "board_tips.json"),
+                   [{"section": "board", "weight": 2, "tips": ["c"]}], 1000)
+        self.config.set_config("tips_file", "board_tips.json")
+        rng = random.Random(1)
+        counter = Counter(rand_tips(self.config, rng) for _ in range(4000))
+        self.assertAlmostEqual(counter["c"] / 4000, 0.5, delta=0.05)
+        self.assertAlmostEqual(counter["a"] / 4000, 0.25, delta=0.05)
+
+    def test_reload_on_change(self):
+        self.assertIn(rand_tips(self.config), ("a", "b"))
+        write_tips(self.global_file, [{"section": "tips", "tips": ["d"]}], 2000)
+        self.assertEqual(rand_tips(self.config), "d")
+
+    def test_invalid_weight(self):
+        write_tips(self.global_file, [{"section": "tips", "weight": -1, "tips": ["a"]}], 2000)
+        with self.assertRaises(ValueError):
+            rand_tips(self.config)
+
+    def test_zero_weights(self):
+        write_tips(self.global_file, [{"section": "tips", "weight": 0, "tips": ["a", "b"]}], 2000)
+        with self.assertRaises(ValueError):
+            rand_tips(self.config)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+
+from module.config import Config
+from module.structures import DailyJson, SubmissionData, UserData, RankingData
+from module.user_index import UserIndex, normalize_name
+
+
+def make_daily() -> DailyJson:
+    submissions = [
+        SubmissionData(UserData("Alice (alice_w)", "10"), 100, "Accepted", "1001", "A + B", 1700000300),
+        SubmissionData(UserData("qwedc001", "2"), 0, "Wrong Answer", "1002", "A - B", 1700000200),
+        SubmissionData(UserData("bob", "11"), 0, "Wrong Answer", "1002", "A - B", 1700000100),
+    ]
+    rankings = [RankingData("qwedc001", 12, "2", 1, False),
+                RankingData("Ｑｗｅｒｔｙ", 7, "3", 2, False),
+                RankingData("bobby", 5, "4", 3, False)]
+    return DailyJson(submissions, rankings)
+
+
+class TestUserIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        os.mkdir(os.path.join(self.work_dir.name, "data"))
+        self.index = UserIndex(Config(self.work_dir.name, {'handler': 'Hydro', 'id': 'test'}))
+        self.index.update(make_daily())
+
+    def tearDown(self):
+        self.index.close()
+        self.work_dir.cleanup()
+
+    def test_normalize(self):
+        self.assertEqual(normalize_name(" Ｑｗｅｒｔｙ "), "qwerty")
+
+    def test_exact(self):
+        self.assertEqual(self.index.search("qwedc001"), "2")
+        self.assertEqual(self.index.search("bob"), "11")
+
+    def test_normalized(self):
+        self.assertEqual(self.index.search("QWERTY"), "3")
+        self.assertEqual(self.index.search("ALICE_W"), "10")
+        self.assertEqual(self.index.search("alice"), "10")
+
+    def test_fuzzy(self):
+        self.assertEqual(self.index.search("qwedc01"), "2")
+        # 排行榜中的用户优先
+        self.assertEqual(self.index.search("bo"), "4")
+        self.assertIsNone(self.index.search("zzzzzzzz"))
+
+    def test_update(self):
+        daily = make_daily()
+        daily.rankings[1].user_name = "renamed"
+        self.index.update(daily)
+        self.assertEqual(self.index.search("renamed"), "3")
+        self.assertNotEqual(self.index.search("qwerty"), "3")
+
+    def test_user_stats(self):
+        self.assertIsNone(self.index.get_user_stats("10", "2026-01-01"))
+        self.index.update(make_daily(), "2026-01-01")
+        self.assertEqual(self.index.get_user_stats("10", "2026-01-01"), (1, 100, 1))
+        self.assertEqual(self.index.get_user_stats("3", "2026-01-01"), (0, 0, 0))
+        self.assertIsNone(self.index.get_user_stats("10", "2026-01-02"))
+
+    def test_profile(self):
+        user = UserData("qwedc001", "2")
+        user.qq, user.description = "10001", "第一行\n第二行"
+        self.index.save_profile(user, 1700000000)
+        cached, fetched_at = self.index.get_profile("2")
+        self.assertEqual(cached.to_json(), user.to_json())
+        self.assertEqual(fetched_at, 1700000000)
+        self.index.remove_profile("2")
+        self.assertIsNone(self.index.get_profile("2"))
+
+
+if __name__ == '__main__':
+    unittest.main()